@@ -0,0 +1,60 @@
+"""Benchmark job-history writes and dashboard queries as the table grows.
+
+Usage:
+    python benchmarks/bench_history.py [--rows N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from utilities_web.history import JobHistory  # noqa: E402
+
+
+def timed(label: str, func, repeat: int = 5) -> None:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    print(f"{label:<32} best {min(samples) * 1000:8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    now = time.time()
+    with tempfile.TemporaryDirectory() as tmp:
+        history = JobHistory(os.path.join(tmp, "history.db"))
+        start = time.perf_counter()
+        for i in range(args.rows):
+            history.record(
+                f"utility-{i % 15}",
+                str(i),
+                now - rng.random() * 30 * 24 * 3600,
+                rng.lognormvariate(0, 1.5),
+                "success" if rng.random() > 0.05 else "error",
+            )
+        elapsed = time.perf_counter() - start
+        print(f"{'record':<32} {elapsed / args.rows * 1e6:8.1f} us/row ({args.rows} rows)")
+
+        oldest = history.page(limit=1)[0]["id"] - args.rows + 100
+        timed("summary (one utility)", lambda: history.summary("utility-3", now=now))
+        timed("dashboard (all utilities)",
+              lambda: [history.summary(name, now=now) for name in history.utilities()])
+        timed("page (first)", lambda: history.page(limit=50))
+        timed("page (deep)", lambda: history.page(before=oldest, limit=50))
+        timed("page (one utility)", lambda: history.page(utility="utility-7", limit=50))
+        history.close()
+
+
+if __name__ == "__main__":
+    main()
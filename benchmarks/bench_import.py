@@ -0,0 +1,59 @@
+"""Benchmark cold import and app start-up time of utilities_web.
+
+Each sample runs in a fresh interpreter so module caches do not carry over.
+
+Usage:
+    python benchmarks/bench_import.py [--runs N]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+SNIPPETS = {
+    "import utilities_web": "import utilities_web",
+    "import input types": "from utilities_web import FileInput, TextInput",
+    "create_app + first GET": (
+        "from utilities_web import create_app\n"
+        "app = create_app(process_handler=lambda: None, upload_folder='bench_uploads')\n"
+        "app.test_client().get('/')\n"
+    ),
+}
+
+TIMER = (
+    "import time\n"
+    "_t = time.perf_counter()\n"
+    "{snippet}\n"
+    "print(time.perf_counter() - _t)\n"
+)
+
+
+def measure(snippet: str, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", TIMER.format(snippet=snippet)],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    for name, snippet in SNIPPETS.items():
+        samples = measure(snippet, args.runs)
+        print(
+            f"{name:<24} median {statistics.median(samples) * 1000:7.1f} ms"
+            f"   min {min(samples) * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 """utilities_web — reusable Flask web UI for data processing utilities."""
 
-from .app_factory import create_app
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
 from .input_types import (
     CheckboxInput,
     FileInput,
@@ -9,11 +11,38 @@ from .input_types import (
     TextInput,
 )
 
+if TYPE_CHECKING:
+    from .app_factory import Utility, create_app
+    from .suite import create_suite
+
 __all__ = [
     "create_app",
+    "create_suite",
+    "Utility",
     "FileInput",
     "TextInput",
     "NumberInput",
     "SelectInput",
     "CheckboxInput",
 ]
+
+# Names that pull in Flask are resolved on first access so that importing the
+# package (e.g. just for the input types) stays cheap.
+_LAZY_ATTRS = {
+    "create_app": ".app_factory",
+    "Utility": ".app_factory",
+    "create_suite": ".suite",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -2,15 +2,93 @@
 
 import logging
 import os
+import posixpath
+import re
+import select
+import socket
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
 from typing import Any, Callable, Dict, List, Optional
 
-from flask import Flask, flash, redirect, render_template, request, send_from_directory, url_for
+from flask import (
+    Blueprint,
+    Flask,
+    Response,
+    copy_current_request_context,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    send_from_directory,
+    url_for,
+)
+from jinja2 import FileSystemBytecodeCache
+from werkzeug.utils import secure_filename
 
-from .input_types import CheckboxInput, FileInput
-from .processor import run_callable, run_subprocess
+from .artifacts import directory_artifacts, iter_zip, resolve_artifacts
+from .command import CommandTemplate
+from .history import JobHistory
+from .input_types import FileInput
+from .jobs import JobRegistry, job_status, new_job_id
+from .processor import aborted_result, run_callable, run_subprocess
+from .validation import FormValidator
 
 logger = logging.getLogger(__name__)
 
+#: Placeholder naming the per-job output directory in *process_command*.
+OUTPUT_DIR_FIELD = "output_dir"
+
+_JOB_ID = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+@dataclass
+class Utility:
+    """Definition of a single utility: its form and how to process it.
+
+    Exactly one of *process_command* or *process_handler* must be provided.
+
+    Args:
+        title: Page title shown in the browser and heading.
+        inputs: List of input field definitions (FileInput, TextInput, etc.).
+        process_command: Subprocess command list with ``{field}`` placeholders.
+        process_handler: Python callable that receives form data as kwargs.
+        output_folder: Directory from which result files are served for download.
+            See :func:`create_app` for how results name their files.
+        example_folder: Directory containing example files for download.
+        enable_examples: Whether to show example download buttons.
+        custom_css: Extra CSS injected into the page ``<style>`` tag.
+        success_message: Message shown on the result page after success.
+        error_handler: Optional callable invoked when processing raises.
+        timeout: Deadline in seconds for each *process_command* job.
+        max_concurrent: Maximum number of jobs this utility may run at once.
+        description: Short description shown on the suite index page.
+    """
+    title: str = "Utility"
+    inputs: List = field(default_factory=list)
+    process_command: Optional[List[str]] = None
+    process_handler: Optional[Callable[..., Any]] = None
+    output_folder: Optional[str] = None
+    example_folder: Optional[str] = None
+    enable_examples: bool = False
+    custom_css: Optional[str] = None
+    success_message: str = "Processing complete!"
+    error_handler: Optional[Callable[[Exception], Dict[str, Any]]] = None
+    timeout: Optional[float] = None
+    max_concurrent: Optional[int] = None
+    description: Optional[str] = None
+
+    def __post_init__(self):
+        if self.process_command is None and self.process_handler is None:
+            raise ValueError("Either process_command or process_handler must be provided")
+        if self.process_command is not None and self.process_handler is not None:
+            raise ValueError("Only one of process_command or process_handler may be provided")
+        if self.inputs is None:
+            self.inputs = []
+
 
 def create_app(
     title: str = "Utility",
@@ -24,6 +102,10 @@ def create_app(
     custom_css: Optional[str] = None,
     success_message: str = "Processing complete!",
     error_handler: Optional[Callable[[Exception], Dict[str, Any]]] = None,
+    timeout: Optional[float] = None,
+    max_concurrent: Optional[int] = None,
+    history_db: Optional[str] = None,
+    name: Optional[str] = None,
 ) -> Flask:
     """Create a Flask app that renders a form and processes submissions.
 
@@ -36,90 +118,269 @@ def create_app(
         process_handler: Python callable that receives form data as kwargs.
         upload_folder: Directory where uploaded files are saved.
         output_folder: Directory from which result files are served for download.
-            When set, result data may include a ``download_file`` key (basename)
-            to trigger a download button on the result page.
+            When set, result data may name files inside it with a
+            ``download_file`` key, an ``artifacts`` list and/or an
+            ``output_dir`` subdirectory; the result page then offers each
+            file plus a "download all" ZIP.  *process_command* may also use
+            an ``{output_dir}`` placeholder, a fresh directory per job whose
+            files become the job's artifacts.
         example_folder: Directory containing example files for download.
         enable_examples: Whether to show example download buttons.
         custom_css: Extra CSS injected into the page ``<style>`` tag.
         success_message: Message shown on the result page after success.
         error_handler: Optional callable invoked when processing raises.
+        timeout: Deadline in seconds for each *process_command* job.  A
+            submission may ask for a shorter deadline through the reserved
+            ``_timeout`` form field, but never a longer one.  Jobs that run
+            past their deadline, are cancelled via ``POST /cancel/<job_id>``,
+            or whose client disconnects have their whole process tree killed.
+        max_concurrent: Maximum number of jobs allowed to run at once.
+            Further submissions are turned away until a job finishes.
+        history_db: Path of a SQLite database in which every execution is
+            recorded.  Enables the ``/history`` and ``/history/dashboard``
+            pages.
+        name: Name under which executions are recorded in *history_db*, so
+            separate apps sharing one database stay apart.  Defaults to a
+            slug of *title*.
 
     Returns:
         A configured Flask application instance.
     """
-    if process_command is None and process_handler is None:
-        raise ValueError("Either process_command or process_handler must be provided")
-    if process_command is not None and process_handler is not None:
-        raise ValueError("Only one of process_command or process_handler may be provided")
-
-    if inputs is None:
-        inputs = []
+    utility = Utility(
+        title=title,
+        inputs=inputs or [],
+        process_command=process_command,
+        process_handler=process_handler,
+        output_folder=output_folder,
+        example_folder=example_folder,
+        enable_examples=enable_examples,
+        custom_css=custom_css,
+        success_message=success_message,
+        error_handler=error_handler,
+        timeout=timeout,
+        max_concurrent=max_concurrent,
+    )
 
     app = Flask(__name__)
     app.secret_key = os.urandom(24)
+    enable_template_cache(app)
+
+    history = JobHistory(history_db) if history_db else None
+    if history is not None:
+        app.register_blueprint(build_history_blueprint(history))
+        app.extensions["utilities_web.history"] = history
+
+    blueprint, jobs = build_blueprint(
+        "utility", utility, upload_folder, history=history,
+        history_name=name or secure_filename(title) or "utility",
+    )
+    app.register_blueprint(blueprint)
+    app.extensions["utilities_web.jobs"] = jobs
+
+    return app
+
+
+def build_blueprint(
+    name: str,
+    utility: Utility,
+    upload_folder: str,
+    executor: Optional[Executor] = None,
+    history: Optional[JobHistory] = None,
+    history_name: Optional[str] = None,
+):
+    """Build the blueprint serving *utility*'s form, result and download routes.
+
+    Args:
+        name: Blueprint name; must be unique within the owning app.
+        utility: The utility definition to serve.
+        upload_folder: Directory where uploaded files are saved.
+        executor: Optional executor that runs jobs.  When omitted, jobs run
+            on the request thread.  Jobs run inside a copy of the submitting
+            request's context, so handlers may use :data:`flask.request`.
+        history: Optional store in which every execution is recorded under
+            *history_name*, with the utility's title registered for display.
+        history_name: Name identifying the utility in *history*.  Defaults
+            to *name*.
+
+    Returns:
+        A ``(blueprint, jobs)`` tuple, where *jobs* is the utility's
+        :class:`~utilities_web.jobs.JobRegistry`.
+    """
+    title = utility.title
+    inputs = utility.inputs
+    process_command = utility.process_command
+    process_handler = utility.process_handler
+    output_folder = utility.output_folder
+    example_folder = utility.example_folder
+    enable_examples = utility.enable_examples
+    custom_css = utility.custom_css
+    success_message = utility.success_message
+    error_handler = utility.error_handler
+    timeout = utility.timeout
+
+    bp = Blueprint(name, __name__)
 
     os.makedirs(upload_folder, exist_ok=True)
 
+    jobs = JobRegistry(max_concurrent=utility.max_concurrent)
+    history_name = history_name or name
+    if history is not None:
+        history.titles[history_name] = title
+
     # Resolve example files list
     example_files: List[str] = []
     if enable_examples and example_folder and os.path.isdir(example_folder):
         example_files = sorted(os.listdir(example_folder))
 
-    @app.route("/", methods=["GET", "POST"])
+    # Compile once so unknown placeholders fail at start-up, not per request.
+    command = None
+    if process_command is not None:
+        fields = [inp.name for inp in inputs]
+        if output_folder:
+            if OUTPUT_DIR_FIELD in fields:
+                raise ValueError(f"Input name {OUTPUT_DIR_FIELD!r} is reserved when output_folder is set")
+            fields.append(OUTPUT_DIR_FIELD)
+        command = CommandTemplate(process_command, fields=fields)
+
+    file_inputs = [inp for inp in inputs if isinstance(inp, FileInput)]
+    file_fields = [inp.name for inp in file_inputs]
+    validator = FormValidator(inputs)
+
+    def execute(form_data, job_id, job_timeout, cancel_event, is_disconnected, submitted):
+        """Run one job and return ``(result, usage)``."""
+        # A job may have waited in the executor's queue for a free worker
+        # since *submitted*; that wait counts toward its deadline, and a job
+        # cancelled or abandoned meanwhile is never started.
+        remaining = job_timeout
+        if remaining is not None and submitted is not None:
+            remaining -= time.monotonic() - submitted
+        if cancel_event.is_set():
+            return aborted_result("cancelled", job_timeout), None
+        if is_disconnected():
+            return aborted_result("disconnected", job_timeout), None
+        if command is not None:
+            if remaining is not None and remaining <= 0:
+                return aborted_result("timeout", job_timeout), None
+            job_dir = None
+            if output_folder:
+                # Always a fresh directory, even if a job id is reused later.
+                os.makedirs(output_folder, exist_ok=True)
+                job_dir = tempfile.mkdtemp(prefix=f"{job_id}-", dir=output_folder)
+                form_data = {**form_data, OUTPUT_DIR_FIELD: job_dir}
+            result = run_subprocess(
+                command,
+                form_data,
+                timeout=remaining,
+                cancel_event=cancel_event,
+                is_disconnected=is_disconnected,
+                manifest_dir=upload_folder,
+            )
+            if job_dir is not None:
+                if os.listdir(job_dir):
+                    result["data"].setdefault(OUTPUT_DIR_FIELD, os.path.basename(job_dir))
+                else:
+                    os.rmdir(job_dir)
+            return result, result["data"].get("usage")
+        cpu_start = time.thread_time()
+        result = run_callable(process_handler, form_data)
+        return result, {"cpu_seconds": round(time.thread_time() - cpu_start, 6)}
+
+    @bp.route("/", methods=["GET", "POST"])
     def index():
         if request.method == "POST":
-            form_data: Dict[str, Any] = {}
-
-            for inp in inputs:
-                if isinstance(inp, FileInput):
-                    if inp.multiple:
-                        files = request.files.getlist(inp.name)
-                        saved = [os.path.join(upload_folder, f.filename)
-                                 for f in files if f and f.filename]
-                        for f, path in zip(
-                            [x for x in files if x and x.filename], saved
-                        ):
-                            f.save(path)
-                        if not saved and inp.required:
-                            flash(f"Missing required file: {inp.label}", "error")
-                            return redirect(url_for("index"))
-                        form_data[inp.name] = saved
-                    else:
-                        file = request.files.get(inp.name)
-                        if file and file.filename:
-                            path = os.path.join(upload_folder, file.filename)
-                            file.save(path)
-                            form_data[inp.name] = path
-                        elif inp.required:
-                            flash(f"Missing required file: {inp.label}", "error")
-                            return redirect(url_for("index"))
-                elif isinstance(inp, CheckboxInput):
-                    form_data[inp.name] = inp.name in request.form
-                else:
-                    value = request.form.get(inp.name, "")
-                    if inp.required and not value:
-                        flash(f"Missing required field: {inp.label}", "error")
-                        return redirect(url_for("index"))
-                    form_data[inp.name] = value
+            # Reject bad submissions before saving uploads or starting a job.
+            checked = validator.validate(request.form, request.files)
+            if not checked.ok:
+                for message in checked.errors.values():
+                    flash(message, "error")
+                return redirect(url_for(".index"))
 
-            logger.info("Processing form submission", extra={"title": title})
+            # Handlers get typed values; commands get the submitted strings.
+            form_data: Dict[str, Any] = dict(
+                checked.raw if command is not None else checked.values
+            )
+
+            job_id = request.form.get("_job_id", "")
+            if not _JOB_ID.fullmatch(job_id):
+                job_id = new_job_id()
+            job_timeout = _job_timeout(timeout, request.form.get("_timeout"))
+            logger.info("Processing form submission", extra={"title": title, "job_id": job_id})
 
             try:
-                if process_command is not None:
-                    result = run_subprocess(process_command, form_data)
+                cancel_event = jobs.start(job_id)
+            except ValueError:
+                # The same form was submitted again while its job is running.
+                logger.warning("Duplicate job id rejected", extra={"title": title, "job_id": job_id})
+                flash("This form was already submitted and its job is still running.", "error")
+                return redirect(url_for(".index"))
+            if cancel_event is None:
+                logger.warning("Job rejected at capacity", extra={"title": title})
+                flash(f"{title} is busy; please try again shortly.", "error")
+                return redirect(url_for(".index"))
+
+            result = None
+            usage = None
+            started_at = time.time()
+            started = time.monotonic()
+            try:
+                form_data.update(_save_uploads(file_inputs, upload_folder))
+                args = (
+                    form_data, job_id, job_timeout, cancel_event, _disconnect_probe(request.environ)
+                )
+                if executor is not None:
+                    job = copy_current_request_context(execute)
+                    result, usage = executor.submit(job, *args, time.monotonic()).result()
                 else:
-                    result = run_callable(process_handler, form_data)
+                    result, usage = execute(*args, None)
             except Exception as exc:
                 if error_handler:
                     result = error_handler(exc)
                 else:
                     logger.error("Unhandled processing error", extra={"error": str(exc)})
                     result = {"status": "error", "output": str(exc), "data": {}}
+            finally:
+                jobs.finish(job_id, result)
+
+            data = result.get("data") if isinstance(result, dict) else None
+            artifacts = resolve_artifacts(data, output_folder)
+
+            if history is not None:
+                output_location = None
+                if artifacts:
+                    paths = [os.path.join(output_folder, name) for name in artifacts]
+                    output_location = paths[0] if len(paths) == 1 else os.path.commonpath(paths)
+                _record_job(
+                    history,
+                    history_name,
+                    job_id,
+                    started_at,
+                    time.monotonic() - started,
+                    result,
+                    usage,
+                    [form_data.get(name) for name in file_fields],
+                    output_location,
+                )
+
+            zip_url = None
+            if len(artifacts) > 1:
+                # Link by directory only when the route resolves it to exactly
+                # these artifacts; otherwise list the files themselves.
+                subdir = data.get(OUTPUT_DIR_FIELD)
+                if (
+                    subdir
+                    and not set(data) & {"download_file", "artifacts"}
+                    and directory_artifacts(output_folder, str(subdir)) == artifacts
+                ):
+                    zip_url = url_for(".download_all", dir=subdir)
+                else:
+                    zip_url = url_for(".download_all", file=artifacts)
 
             return render_template(
                 "result.html",
                 title=title,
                 result=result,
+                artifacts=artifacts,
+                zip_url=zip_url,
                 success_message=success_message,
                 custom_css=custom_css,
             )
@@ -131,20 +392,40 @@ def create_app(
             enable_examples=enable_examples,
             example_files=example_files,
             custom_css=custom_css,
+            job_id=new_job_id(),
+            cancellable=command is not None,
+            history_enabled=history is not None,
+            history_name=history_name,
         )
 
+    @bp.route("/cancel/<job_id>", methods=["POST"])
+    def cancel_job(job_id):
+        if job_id not in jobs:
+            return jsonify({"job_id": job_id, "cancelled": False}), 404
+        if command is None:
+            # Python handlers cannot be interrupted; the job runs to completion.
+            return jsonify({"job_id": job_id, "cancelled": False}), 409
+        cancelled = jobs.cancel(job_id)
+        if cancelled:
+            logger.info("Job cancellation requested", extra={"job_id": job_id})
+        return jsonify({"job_id": job_id, "cancelled": cancelled}), (200 if cancelled else 404)
+
+    @bp.route("/metrics")
+    def metrics():
+        return jsonify(jobs.metrics())
+
     if enable_examples and example_folder:
-        @app.route("/download-example/<filename>")
+        @bp.route("/download-example/<filename>")
         def download_example(filename):
             if os.path.exists(os.path.join(example_folder, filename)):
                 return send_from_directory(example_folder, filename, as_attachment=True)
             flash(f"Example file '{filename}' not found.", "error")
-            return redirect(url_for("index"))
+            return redirect(url_for(".index"))
 
     if output_folder:
         _output_folder = output_folder
 
-        @app.route("/download-result/<filename>")
+        @bp.route("/download-result/<path:filename>")
         def download_result(filename):
             filepath = os.path.join(_output_folder, filename)
             if os.path.exists(filepath):
@@ -152,6 +433,191 @@ def create_app(
                     os.path.abspath(_output_folder), filename, as_attachment=True
                 )
             flash(f"Result file '{filename}' not found.", "error")
-            return redirect(url_for("index"))
+            return redirect(url_for(".index"))
 
-    return app
+        @bp.route("/download-all")
+        def download_all():
+            subdir = request.args.get("dir")
+            if subdir is not None:
+                names = directory_artifacts(_output_folder, subdir)
+            else:
+                names = resolve_artifacts({"artifacts": request.args.getlist("file")}, _output_folder)
+            if not names:
+                flash("No result files found.", "error")
+                return redirect(url_for(".index"))
+
+            # Name entries relative to the deepest directory they share.
+            base = posixpath.commonpath([posixpath.dirname(name) for name in names])
+            root = os.path.realpath(_output_folder)
+            files = [(os.path.join(root, name), posixpath.relpath(name, base or ".")) for name in names]
+            archive_name = f"{secure_filename(title) or 'results'}.zip"
+            logger.info("Streaming result archive", extra={"files": len(files)})
+            return Response(
+                iter_zip(files),
+                mimetype="application/zip",
+                headers={"Content-Disposition": f'attachment; filename="{archive_name}"'},
+            )
+
+    return bp, jobs
+
+
+def _save_uploads(file_inputs: List[FileInput], upload_folder: str) -> Dict[str, Any]:
+    """Save the request's uploaded files and return their paths by field name."""
+    saved: Dict[str, Any] = {}
+    for inp in file_inputs:
+        if inp.multiple:
+            paths = []
+            for f in request.files.getlist(inp.name):
+                if f and f.filename:
+                    path = os.path.join(upload_folder, f.filename)
+                    f.save(path)
+                    paths.append(path)
+            saved[inp.name] = paths
+        else:
+            file = request.files.get(inp.name)
+            if file and file.filename:
+                path = os.path.join(upload_folder, file.filename)
+                file.save(path)
+                saved[inp.name] = path
+    return saved
+
+
+def build_history_blueprint(history: JobHistory, page_size: int = 50) -> Blueprint:
+    """Build the blueprint serving ``/history`` and ``/history/dashboard``."""
+    bp = Blueprint("history", __name__)
+
+    @bp.route("/history")
+    def jobs():
+        utility = request.args.get("utility") or None
+        before = request.args.get("before", type=int)
+        rows = history.page(utility=utility, before=before, limit=page_size)
+        for row in rows:
+            row["started"] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row["started_at"]))
+        next_before = rows[-1]["id"] if len(rows) == page_size else None
+        return render_template(
+            "history.html",
+            title="Job History",
+            rows=rows,
+            utility=utility,
+            utilities=history.utilities(),
+            titles=history.titles,
+            next_before=next_before,
+        )
+
+    @bp.route("/history/dashboard")
+    def dashboard():
+        summaries = {name: history.summary(name) for name in history.utilities()}
+        if request.args.get("format") == "json":
+            return jsonify(summaries)
+        return render_template(
+            "dashboard.html", title="Job Dashboard", summaries=summaries, titles=history.titles
+        )
+
+    return bp
+
+
+def _record_job(
+    history: JobHistory,
+    utility: str,
+    job_id: str,
+    started_at: float,
+    duration: float,
+    result: Dict[str, Any],
+    usage: Optional[Dict[str, Any]],
+    file_values: List[Any],
+    output_location: Optional[str],
+) -> None:
+    """Record a finished job; failures are logged and never reach the user."""
+    paths = []
+    for value in file_values:
+        if isinstance(value, (list, tuple)):
+            paths.extend(value)
+        elif value:
+            paths.append(value)
+    input_bytes = 0
+    for path in paths:
+        try:
+            input_bytes += os.path.getsize(path)
+        except OSError:
+            pass
+
+    data = result.get("data") if isinstance(result.get("data"), dict) else {}
+    usage = usage or {}
+    returncode = data.get("returncode")
+
+    try:
+        history.record(
+            utility,
+            job_id,
+            started_at,
+            duration,
+            job_status(result),
+            returncode=returncode if isinstance(returncode, int) else None,
+            input_files=len(paths),
+            input_bytes=input_bytes,
+            cpu_seconds=usage.get("cpu_seconds"),
+            max_rss_kb=usage.get("max_rss_kb"),
+            output_location=output_location,
+        )
+    except sqlite3.Error as exc:
+        logger.error("Failed to record job history", extra={"error": str(exc)})
+
+
+def enable_template_cache(app: Flask) -> None:
+    """Persist compiled templates so new processes skip Jinja compilation.
+
+    The cache lives in ``$UTILITIES_WEB_TEMPLATE_CACHE`` when set, otherwise
+    in Jinja's default per-user temporary directory.
+    """
+    cache_dir = os.environ.get("UTILITIES_WEB_TEMPLATE_CACHE")
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+
+
+def _job_timeout(app_timeout: Optional[float], requested: Optional[str]) -> Optional[float]:
+    """Resolve a job's deadline from the app limit and an optional request.
+
+    A requested deadline can only tighten the app-wide limit.  Values that
+    are missing, unparsable or not positive are ignored.
+    """
+    try:
+        job_timeout = float(requested) if requested else None
+    except ValueError:
+        job_timeout = None
+    if job_timeout is not None and job_timeout <= 0:
+        job_timeout = None
+    if job_timeout is None:
+        return app_timeout
+    if app_timeout is None:
+        return job_timeout
+    return min(app_timeout, job_timeout)
+
+
+def _disconnect_probe(environ: Dict[str, Any]) -> Callable[[], bool]:
+    """Return a callable reporting whether the requesting client hung up.
+
+    Relies on the raw connection socket the Werkzeug server exposes as
+    ``werkzeug.socket``.  Under servers that do not expose it, the probe
+    always reports the client as connected.
+    """
+    sock = environ.get("werkzeug.socket")
+    if sock is None:
+        return lambda: False
+
+    def is_disconnected() -> bool:
+        if sock.fileno() < 0:
+            return True
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+            if not readable:
+                return False
+            # A readable socket with nothing to peek at means EOF.
+            return sock.recv(1, socket.MSG_PEEK) == b""
+        except ValueError:
+            # TLS sockets reject MSG_PEEK; treat the client as connected.
+            return False
+        except OSError:
+            return True
+
+    return is_disconnected
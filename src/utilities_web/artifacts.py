@@ -0,0 +1,142 @@
+"""Result artifacts — resolving output files and streaming them as a ZIP."""
+
+import io
+import logging
+import os
+import zipfile
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+#: Bytes read from each artifact per step while streaming an archive.
+CHUNK_SIZE = 64 * 1024
+
+#: Extensions whose contents are already compressed.  They are stored as-is
+#: in archives, since deflating them again costs CPU and saves nothing.
+COMPRESSED_EXTENSIONS = frozenset({
+    ".7z", ".avi", ".bz2", ".docx", ".gif", ".gz", ".jar", ".jpeg", ".jpg",
+    ".mkv", ".mov", ".mp3", ".mp4", ".parquet", ".png", ".pptx", ".rar",
+    ".tgz", ".webp", ".xlsx", ".xz", ".zip", ".zst",
+})
+
+
+def resolve_artifacts(data: Any, output_folder: Optional[str]) -> List[str]:
+    """Return the artifacts named by a result's ``data``.
+
+    Artifacts may be given as ``download_file`` (one name), ``artifacts`` (a
+    list of names) and/or ``output_dir`` (a directory whose files are all
+    artifacts).  Names are relative to *output_folder*; absolute paths are
+    accepted when they lie inside it.  Anything outside *output_folder*, or
+    that does not exist, is skipped.
+
+    Returns:
+        Paths relative to *output_folder*, using ``/`` separators, in the
+        order given and without duplicates.
+    """
+    if not output_folder or not isinstance(data, dict):
+        return []
+    root = os.path.realpath(output_folder)
+
+    names: List[str] = []
+    if data.get("download_file"):
+        names.append(data["download_file"])
+    names.extend(data.get("artifacts") or [])
+    if data.get("output_dir"):
+        directory = _inside(root, data["output_dir"])
+        if directory is not None and os.path.isdir(directory):
+            for dirpath, dirnames, filenames in os.walk(directory):
+                dirnames.sort()
+                names.extend(os.path.join(dirpath, f) for f in sorted(filenames))
+
+    seen = set()
+    artifacts = []
+    for name in names:
+        path = _inside(root, str(name))
+        if path is None or not os.path.isfile(path):
+            logger.warning("Skipping artifact outside output folder or missing", extra={"artifact": name})
+            continue
+        rel = os.path.relpath(path, root).replace(os.sep, "/")
+        if rel not in seen:
+            seen.add(rel)
+            artifacts.append(rel)
+    return artifacts
+
+
+def directory_artifacts(output_folder: str, subdir: str) -> List[str]:
+    """Return every file under *subdir* of *output_folder* as artifacts.
+
+    Nothing is returned when *subdir* escapes *output_folder* or resolves
+    to *output_folder* itself, so one request never reaches every job.
+    """
+    root = os.path.realpath(output_folder)
+    directory = _inside(root, subdir)
+    if directory is None or directory == root:
+        return []
+    return resolve_artifacts({"output_dir": directory}, output_folder)
+
+
+def iter_zip(files: Iterable[Tuple[str, str]], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Stream a ZIP archive of *files* without building it in memory or on disk.
+
+    Args:
+        files: ``(path, arcname)`` pairs to add, in order.
+        chunk_size: Bytes read from each source file per step.
+
+    Yields:
+        Successive chunks of the archive.  At most about one chunk of
+        (compressed) data is held at a time.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", allowZip64=True) as archive:
+        for path, arcname in files:
+            info = zipfile.ZipInfo.from_file(path, arcname)
+            ext = os.path.splitext(arcname)[1].lower()
+            info.compress_type = (
+                zipfile.ZIP_STORED if ext in COMPRESSED_EXTENSIONS else zipfile.ZIP_DEFLATED
+            )
+            with open(path, "rb") as src, archive.open(info, mode="w") as dst:
+                while True:
+                    chunk = src.read(chunk_size)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    if sink.pending:
+                        yield sink.drain()
+            if sink.pending:
+                yield sink.drain()
+    # Closing the archive writes the central directory.
+    if sink.pending:
+        yield sink.drain()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable stream that buffers bytes until drained."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._chunks)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _inside(root: str, name: str) -> Optional[str]:
+    """Resolve *name* against *root*, or ``None`` if it escapes *root*."""
+    path = os.path.realpath(os.path.join(root, name))
+    real_root = os.path.realpath(root)
+    if path != real_root and not path.startswith(real_root + os.sep):
+        return None
+    return path
@@ -0,0 +1,128 @@
+"""Command-line entry point — ``utilities-web serve module:app``."""
+
+import argparse
+import importlib
+import logging
+import os
+import sys
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def load_app(target: str) -> Any:
+    """Import and return the WSGI app named by *target*.
+
+    Args:
+        target: ``"module:attribute"`` reference.  The attribute defaults to
+            ``app`` when omitted.  The current directory is importable, as
+            with ``python -m``.
+
+    Returns:
+        The referenced application object.
+    """
+    module_name, _, attr = target.partition(":")
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    module = importlib.import_module(module_name)
+    try:
+        return getattr(module, attr or "app")
+    except AttributeError:
+        raise ValueError(f"Module {module_name!r} has no attribute {attr or 'app'!r}") from None
+
+
+def warm_app(app: Any) -> None:
+    """Compile every template and render the start page once.
+
+    Compiled templates are written to the Jinja bytecode cache, so the first
+    real request -- and the next cold start -- skip template compilation.
+    """
+    env = app.jinja_env
+    for name in env.list_templates(extensions=["html"]):
+        env.get_template(name)
+    with app.test_client() as client:
+        response = client.get("/")
+        if response.status_code >= 400:
+            logger.warning("Warm-up request failed", extra={"status": response.status_code})
+
+
+def serve(app: Any, host: str, port: int, threads: int) -> None:
+    """Serve *app* with a production-grade threaded server.
+
+    Uses waitress when it is installed (``pip install utilities-web[serve]``)
+    and falls back to Werkzeug's server otherwise.  Either way at most
+    *threads* requests are handled at once; further connections wait.
+    Jobs are cancelled when their client disconnects only under the
+    Werkzeug server, since waitress does not expose the client socket.
+    """
+    try:
+        import waitress
+    except ImportError:
+        logger.warning("waitress not installed; using Werkzeug's server")
+        server = make_pooled_server(host, port, app, threads)
+        logger.info("Serving on http://%s:%s", host, server.port)
+        server.serve_forever()
+    else:
+        logger.warning(
+            "Serving with waitress; jobs are not cancelled when their client disconnects"
+        )
+        waitress.serve(app, host=host, port=port, threads=threads)
+
+
+def make_pooled_server(host: str, port: int, app: Any, threads: int) -> Any:
+    """Return a Werkzeug server that handles requests on *threads* workers.
+
+    Werkzeug's own ``threaded=True`` mode starts an unbounded thread per
+    request; this server queues connections for a fixed pool instead.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from werkzeug.serving import BaseWSGIServer
+
+    class PooledWSGIServer(BaseWSGIServer):
+        def __init__(self) -> None:
+            super().__init__(host, port, app)
+            self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="http")
+
+        def process_request(self, request, client_address):
+            self.pool.submit(self._process_request_thread, request, client_address)
+
+        def _process_request_thread(self, request, client_address):
+            # As socketserver.ThreadingMixIn.process_request_thread.
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+        def server_close(self):
+            super().server_close()
+            self.pool.shutdown(wait=True)
+
+    return PooledWSGIServer()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="utilities-web")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="Serve a utilities_web app")
+    serve_parser.add_argument("target", help="App to serve, as module:app")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=8000, help="Port to bind (default: 8000)")
+    serve_parser.add_argument("--threads", type=int, default=8, help="Worker threads (default: 8)")
+    serve_parser.add_argument("--no-warm", action="store_true", help="Skip the warm-up pass")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    app = load_app(args.target)
+    if not args.no_warm:
+        warm_app(app)
+    serve(app, args.host, args.port, args.threads)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
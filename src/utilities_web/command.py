@@ -0,0 +1,195 @@
+"""Compiled command templates for ``process_command``."""
+
+import os
+import re
+import struct
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+# ``{{name}}`` is an escaped literal ``{name}``; ``{...}`` may be a placeholder.
+_NAME = re.compile(r"[A-Za-z_][\w.-]*")
+_TOKEN = re.compile(rf"\{{\{{({_NAME.pattern})\}}\}}|\{{([^{{}}]+)\}}")
+
+# Bytes left free below the OS limit for the loader and late environment changes.
+_ARG_HEADROOM = 4096
+
+# On POSIX each argv and environment entry also costs a pointer in the
+# child's argument block; Windows passes a single command-line string.
+_POINTER_SIZE = 0 if os.name == "nt" else struct.calcsize("P")
+
+
+class _Field:
+    __slots__ = ("name", "token")
+
+    def __init__(self, name: str, token: str) -> None:
+        self.name = name
+        self.token = token
+
+
+_Segment = Union[str, _Field]
+
+
+class CommandTemplate:
+    """A ``process_command`` parsed once into literal and placeholder segments.
+
+    Rendering substitutes form values into the pre-parsed segments instead of
+    re-scanning every part for every field.  A list value (e.g. from a
+    ``FileInput`` with ``multiple=True``) expands into one argv entry per
+    item; ``["--in={files}"]`` becomes ``["--in=a.csv", "--in=b.csv"]``.
+
+    Args:
+        command: Command list with ``{field_name}`` placeholders.  Write
+            ``{{field_name}}`` for a literal ``{field_name}``.
+        fields: Names of the known form fields.  When given, ``{name}``
+            for an unknown identifier-like name raises :class:`ValueError`
+            immediately, while any other braces -- ``{}`` for
+            ``find -exec``, JSON such as ``{"a": 1}`` -- are kept as they
+            are.  When ``None``, placeholders without a value are passed
+            through unchanged.
+    """
+
+    def __init__(self, command: List[str], fields: Optional[Iterable[str]] = None) -> None:
+        self.command = list(command)
+        self._strict = fields is not None
+        known = set(fields) if fields is not None else set()
+        self._parts: List[Tuple[_Segment, ...]] = [
+            self._parse(part, known) for part in self.command
+        ]
+
+    def _parse(self, part: str, known: set) -> Tuple[_Segment, ...]:
+        segments: List[_Segment] = []
+        literal: List[str] = []
+        pos = 0
+        for match in _TOKEN.finditer(part):
+            literal.append(part[pos:match.start()])
+            pos = match.end()
+            token = match.group(0)
+            if match.group(1) is not None:
+                literal.append(token[1:-1])
+                continue
+            name = match.group(2)
+            if self._strict and name not in known:
+                if not _NAME.fullmatch(name):
+                    literal.append(token)
+                    continue
+                raise ValueError(
+                    f"Unknown placeholder {token} in process_command; "
+                    f"known fields: {', '.join(sorted(known)) or '(none)'}"
+                )
+            if any(literal):
+                segments.append("".join(literal))
+            literal = []
+            segments.append(_Field(name, token))
+        literal.append(part[pos:])
+        if any(literal) or not segments:
+            segments.append("".join(literal))
+        return tuple(segments)
+
+    def render(
+        self,
+        form_data: Dict[str, Any],
+        manifest_dir: Optional[str] = None,
+    ) -> Tuple[List[str], List[str]]:
+        """Substitute *form_data* into the template.
+
+        When the expanded command would exceed the OS argument-length limit,
+        the largest list expansions are written one entry per line to an
+        argfile in *manifest_dir*, and replaced by a single ``@<path>``
+        argument (the convention ``argparse`` reads with
+        ``fromfile_prefix_chars="@"``).
+
+        Returns:
+            A ``(argv, manifests)`` tuple.  *manifests* lists the argfiles
+            written; the caller removes them once the process has exited.
+        """
+        groups: List[List[str]] = []
+        expanded: List[int] = []
+        for segments in self._parts:
+            entries, is_list = self._render_part(segments, form_data)
+            if is_list:
+                expanded.append(len(groups))
+            groups.append(entries)
+
+        manifests: List[str] = []
+        budget = arg_max()
+        if _argv_size(groups) > budget:
+            for index in sorted(expanded, key=lambda i: _argv_size([groups[i]]), reverse=True):
+                path = _write_manifest(groups[index], manifest_dir)
+                manifests.append(path)
+                groups[index] = [f"@{path}"]
+                if _argv_size(groups) <= budget:
+                    break
+
+        return [arg for entries in groups for arg in entries], manifests
+
+    def _render_part(
+        self, segments: Tuple[_Segment, ...], form_data: Dict[str, Any]
+    ) -> Tuple[List[str], bool]:
+        list_field: Optional[str] = None
+        for seg in segments:
+            if isinstance(seg, _Field) and isinstance(form_data.get(seg.name), (list, tuple)):
+                if list_field is not None and list_field != seg.name:
+                    raise ValueError(
+                        f"Command part combines list fields {{{list_field}}} and {seg.token}"
+                    )
+                list_field = seg.name
+
+        if list_field is None:
+            return [self._join(segments, form_data, None, None)], False
+        return [
+            self._join(segments, form_data, list_field, item)
+            for item in form_data[list_field]
+        ], True
+
+    def _join(
+        self,
+        segments: Tuple[_Segment, ...],
+        form_data: Dict[str, Any],
+        list_field: Optional[str],
+        item: Any,
+    ) -> str:
+        out = []
+        for seg in segments:
+            if isinstance(seg, str):
+                out.append(seg)
+            elif seg.name == list_field:
+                out.append(str(item))
+            elif seg.name in form_data:
+                out.append(str(form_data[seg.name]))
+            elif self._strict:
+                # Known field without a value, e.g. an optional file left empty.
+                out.append("")
+            else:
+                out.append(seg.token)
+        return "".join(out)
+
+
+def arg_max() -> int:
+    """Return the number of bytes available for a child's argv."""
+    if os.name == "nt":
+        # CreateProcess limits the whole command line to 32767 characters.
+        return 32767 - _ARG_HEADROOM
+    try:
+        limit = os.sysconf("SC_ARG_MAX")
+    except (AttributeError, ValueError, OSError):
+        limit = 128 * 1024
+    env_size = sum(
+        len(os.fsencode(key)) + len(os.fsencode(value)) + 2 + _POINTER_SIZE
+        for key, value in os.environ.items()
+    )
+    return limit - env_size - _ARG_HEADROOM
+
+
+def _argv_size(groups: List[List[str]]) -> int:
+    return sum(
+        len(os.fsencode(arg)) + 1 + _POINTER_SIZE for entries in groups for arg in entries
+    )
+
+
+def _write_manifest(entries: List[str], manifest_dir: Optional[str]) -> str:
+    fd, path = tempfile.mkstemp(suffix=".args", dir=manifest_dir)
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        for entry in entries:
+            fh.write(entry)
+            fh.write("\n")
+    return os.path.abspath(path)
@@ -0,0 +1,261 @@
+"""Persistent job history — an indexed SQLite store of every execution.
+
+Raw executions go to the ``jobs`` table, paged newest-first by primary key.
+Each insert also updates two hourly rollup tables: job counts and a
+log-scale histogram of durations.  Dashboard queries read only the rollups,
+so percentile and throughput summaries cost the same at a thousand rows
+as at millions.
+"""
+
+import math
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .jobs import CANCELLED_STATUSES
+
+#: Ratio between consecutive duration histogram bins.  Percentiles read from
+#: the histogram are accurate to within about half of this growth (~2.5%).
+BIN_GROWTH = 1.05
+
+#: Width of a rollup bucket in seconds.
+BUCKET_SECONDS = 3600
+
+#: Dashboard windows as ``(label, seconds)``.
+WINDOWS: Tuple[Tuple[str, int], ...] = (
+    ("24 hours", 24 * 3600),
+    ("7 days", 7 * 24 * 3600),
+    ("30 days", 30 * 24 * 3600),
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    utility TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    status TEXT NOT NULL,
+    returncode INTEGER,
+    input_files INTEGER NOT NULL DEFAULT 0,
+    input_bytes INTEGER NOT NULL DEFAULT 0,
+    cpu_seconds REAL,
+    max_rss_kb INTEGER,
+    output_location TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_by_utility ON jobs (utility, id);
+CREATE TABLE IF NOT EXISTS job_hours (
+    utility TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    jobs INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    cancelled INTEGER NOT NULL,
+    busy_seconds REAL NOT NULL,
+    PRIMARY KEY (utility, hour)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS job_duration_bins (
+    utility TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    bin INTEGER NOT NULL,
+    jobs INTEGER NOT NULL,
+    PRIMARY KEY (utility, hour, bin)
+) WITHOUT ROWID;
+"""
+
+_COLUMNS = (
+    "id", "utility", "job_id", "started_at", "duration", "status", "returncode",
+    "input_files", "input_bytes", "cpu_seconds", "max_rss_kb", "output_location",
+)
+
+
+def duration_bin(duration: float) -> int:
+    """Return the histogram bin for a duration in seconds."""
+    ms = duration * 1000.0
+    if ms <= 1.0:
+        return 0
+    return int(math.log(ms) / math.log(BIN_GROWTH))
+
+
+def bin_value(bin_index: int) -> float:
+    """Return the representative duration in seconds for a histogram bin."""
+    return BIN_GROWTH ** (bin_index + 0.5) / 1000.0
+
+
+class JobHistory:
+    """SQLite-backed record of job executions.
+
+    Connections are opened per thread, and the database runs in WAL mode so
+    the dashboard can read while jobs are being recorded.
+
+    Jobs are recorded under a utility's blueprint name, which is unique
+    within an app; :attr:`titles` maps those names to display titles.
+
+    Args:
+        path: Database file path.  Created on first use.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.titles: Dict[str, str] = {}
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def record(
+        self,
+        utility: str,
+        job_id: str,
+        started_at: float,
+        duration: float,
+        status: str,
+        returncode: Optional[int] = None,
+        input_files: int = 0,
+        input_bytes: int = 0,
+        cpu_seconds: Optional[float] = None,
+        max_rss_kb: Optional[int] = None,
+        output_location: Optional[str] = None,
+    ) -> int:
+        """Store one execution and update the hourly rollups.
+
+        Returns:
+            The new row id.
+        """
+        hour = int(started_at // BUCKET_SECONDS) * BUCKET_SECONDS
+        is_error = status not in CANCELLED_STATUSES and status != "success"
+        with self._connect() as conn:
+            cur = conn.execute(
+                "INSERT INTO jobs (utility, job_id, started_at, duration, status, returncode,"
+                " input_files, input_bytes, cpu_seconds, max_rss_kb, output_location)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (utility, job_id, started_at, duration, status, returncode,
+                 input_files, input_bytes, cpu_seconds, max_rss_kb, output_location),
+            )
+            conn.execute(
+                "INSERT INTO job_hours (utility, hour, jobs, errors, cancelled, busy_seconds)"
+                " VALUES (?, ?, 1, ?, ?, ?)"
+                " ON CONFLICT (utility, hour) DO UPDATE SET"
+                " jobs = jobs + 1, errors = errors + excluded.errors,"
+                " cancelled = cancelled + excluded.cancelled,"
+                " busy_seconds = busy_seconds + excluded.busy_seconds",
+                (utility, hour, int(is_error), int(status in CANCELLED_STATUSES), duration),
+            )
+            conn.execute(
+                "INSERT INTO job_duration_bins (utility, hour, bin, jobs) VALUES (?, ?, ?, 1)"
+                " ON CONFLICT (utility, hour, bin) DO UPDATE SET jobs = jobs + 1",
+                (utility, hour, duration_bin(duration)),
+            )
+        return cur.lastrowid
+
+    def page(
+        self,
+        utility: Optional[str] = None,
+        before: Optional[int] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Return up to *limit* executions, newest first.
+
+        Pagination is by key: pass the smallest ``id`` of the previous page
+        as *before*, so every page is an index range scan however deep it is.
+        """
+        clauses: List[str] = []
+        params: List[Any] = []
+        if utility is not None:
+            clauses.append("utility = ?")
+            params.append(utility)
+        if before is not None:
+            clauses.append("id < ?")
+            params.append(before)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connect().execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM jobs {where} ORDER BY id DESC LIMIT ?",
+            (*params, limit),
+        )
+        return [dict(row) for row in rows]
+
+    def utilities(self) -> List[str]:
+        """Return the names of all utilities with recorded jobs."""
+        rows = self._connect().execute("SELECT DISTINCT utility FROM job_hours ORDER BY utility")
+        return [row[0] for row in rows]
+
+    def summary(
+        self,
+        utility: str,
+        windows: Iterable[Tuple[str, int]] = WINDOWS,
+        now: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Summarise *utility* over each time window.
+
+        Windows are aligned to whole rollup buckets, so a window may include
+        up to one extra partial hour.
+
+        Returns:
+            One dict per window with ``window``, ``jobs``, ``per_hour``,
+            ``error_rate``, ``cancelled``, ``busy_seconds`` and ``p50``,
+            ``p95``, ``p99`` durations in seconds (``None`` when empty).
+        """
+        now = time.time() if now is None else now
+        conn = self._connect()
+        summaries = []
+        for label, seconds in windows:
+            since = int((now - seconds) // BUCKET_SECONDS) * BUCKET_SECONDS
+            totals = conn.execute(
+                "SELECT COALESCE(SUM(jobs), 0), COALESCE(SUM(errors), 0),"
+                " COALESCE(SUM(cancelled), 0), COALESCE(SUM(busy_seconds), 0)"
+                " FROM job_hours WHERE utility = ? AND hour >= ?",
+                (utility, since),
+            ).fetchone()
+            bins = conn.execute(
+                "SELECT bin, SUM(jobs) FROM job_duration_bins"
+                " WHERE utility = ? AND hour >= ? GROUP BY bin ORDER BY bin",
+                (utility, since),
+            ).fetchall()
+            jobs = totals[0]
+            summary = {
+                "window": label,
+                "jobs": jobs,
+                "per_hour": jobs / (seconds / 3600.0),
+                "error_rate": totals[1] / jobs if jobs else 0.0,
+                "cancelled": totals[2],
+                "busy_seconds": totals[3],
+            }
+            summary.update(_percentiles(bins, (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))))
+            summaries.append(summary)
+        return summaries
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def _percentiles(
+    bins: List[Tuple[int, int]], quantiles: Iterable[Tuple[str, float]]
+) -> Dict[str, Optional[float]]:
+    """Read quantiles off a ``[(bin, count), ...]`` histogram sorted by bin."""
+    total = sum(count for _, count in bins)
+    out: Dict[str, Optional[float]] = {}
+    for name, q in quantiles:
+        if not total:
+            out[name] = None
+            continue
+        rank = max(1, math.ceil(q * total))
+        seen = 0
+        for bin_index, count in bins:
+            seen += count
+            if seen >= rank:
+                out[name] = bin_value(bin_index)
+                break
+    return out
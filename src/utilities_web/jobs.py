@@ -0,0 +1,122 @@
+"""Job tracking for utilities_web — cancellation flags, limits and metrics."""
+
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+
+#: Statuses counted as cancellations rather than failures.  A job stopped
+#: by its deadline is a failure: nobody asked for it to stop.
+CANCELLED_STATUSES = frozenset({"cancelled", "disconnected"})
+
+
+def job_status(result: Dict[str, Any]) -> str:
+    """Classify a result dict as ``success``, ``error`` or a stop reason."""
+    if result.get("status") == "success":
+        return "success"
+    return (result.get("data") or {}).get("cancelled") or "error"
+
+
+def new_job_id() -> str:
+    """Return a fresh, URL-safe job identifier."""
+    return uuid.uuid4().hex
+
+
+class JobRegistry:
+    """Thread-safe registry of running jobs for a single utility.
+
+    Each running job is keyed by its id and owns a :class:`threading.Event`
+    that is set when the job is cancelled.  The processor polls the event
+    and kills the job's process tree as soon as it is set.
+
+    The registry also enforces the utility's concurrency limit and keeps
+    its counters, so utilities sharing a process stay independent.
+
+    Args:
+        max_concurrent: Maximum number of jobs allowed to run at once, or
+            ``None`` for no limit.
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = None) -> None:
+        self.max_concurrent = max_concurrent
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Tuple[threading.Event, float]] = {}
+        self._counts: Dict[str, int] = {
+            "started": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "rejected": 0,
+        }
+        self._busy_seconds = 0.0
+
+    def start(self, job_id: str) -> Optional[threading.Event]:
+        """Register *job_id* as running and return its cancellation event.
+
+        Returns:
+            The job's cancellation event, or ``None`` if the utility is
+            already running ``max_concurrent`` jobs.
+
+        Raises:
+            ValueError: If a job with the same id is already running, e.g.
+                when a form is submitted again from the browser's history.
+        """
+        event = threading.Event()
+        with self._lock:
+            if job_id in self._jobs:
+                raise ValueError(f"Job {job_id!r} is already running")
+            if self.max_concurrent is not None and len(self._jobs) >= self.max_concurrent:
+                self._counts["rejected"] += 1
+                return None
+            self._jobs[job_id] = (event, time.monotonic())
+            self._counts["started"] += 1
+        return event
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation of *job_id*.
+
+        Returns:
+            ``True`` if the job was running, ``False`` if it is unknown or
+            has already finished.
+        """
+        with self._lock:
+            entry = self._jobs.get(job_id)
+        if entry is None:
+            return False
+        entry[0].set()
+        return True
+
+    def finish(self, job_id: str, result: Optional[Dict[str, Any]] = None) -> None:
+        """Forget *job_id* once it has completed and record its outcome."""
+        with self._lock:
+            entry = self._jobs.pop(job_id, None)
+            if entry is None:
+                return
+            self._busy_seconds += time.monotonic() - entry[1]
+            if result is None:
+                return
+            status = job_status(result)
+            if status == "success":
+                self._counts["succeeded"] += 1
+            elif status in CANCELLED_STATUSES:
+                self._counts["cancelled"] += 1
+            else:
+                self._counts["failed"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return a snapshot of this utility's job counters."""
+        with self._lock:
+            snapshot: Dict[str, Any] = dict(self._counts)
+            snapshot["active"] = len(self._jobs)
+            snapshot["busy_seconds"] = round(self._busy_seconds, 3)
+        snapshot["max_concurrent"] = self.max_concurrent
+        return snapshot
+
+    def __contains__(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._jobs
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._jobs)
@@ -1,78 +1,221 @@
 """Process execution module — runs subprocess commands or Python callables."""
 
 import logging
+import os
+import signal
 import subprocess
-from typing import Any, Callable, Dict, List, Optional
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .command import CommandTemplate
 
 logger = logging.getLogger(__name__)
 
+#: Seconds between checks for cancellation, client disconnect and deadline.
+POLL_INTERVAL = 0.2
+
 
 def run_subprocess(
-    command: List[str],
+    command: Union[List[str], CommandTemplate],
     form_data: Dict[str, Any],
-    timeout: Optional[int] = None,
+    timeout: Optional[float] = None,
+    cancel_event: Optional[threading.Event] = None,
+    is_disconnected: Optional[Callable[[], bool]] = None,
+    manifest_dir: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Execute a subprocess command with placeholder substitution.
 
     Placeholders in the command list (e.g. ``{field_name}``) are replaced
     with corresponding values from *form_data*.  File fields are replaced
-    with the saved file path.
+    with the saved file path; list values expand into one argument per
+    item (see :class:`~utilities_web.command.CommandTemplate`).
+
+    The child is started in its own process group (its own session on
+    POSIX), so when the job times out or is cancelled the whole process
+    tree -- including any grandchildren it spawned -- is killed at once.
 
     Args:
-        command: Command list with ``{field_name}`` placeholders.
+        command: Command list with ``{field_name}`` placeholders, or a
+            pre-compiled :class:`~utilities_web.command.CommandTemplate`.
         form_data: Mapping of field names to submitted values / file paths.
         timeout: Optional timeout in seconds.
+        cancel_event: Optional event; setting it cancels the job.
+        is_disconnected: Optional callable returning ``True`` once the
+            requesting client has gone away, which also cancels the job.
+        manifest_dir: Directory for argfiles written when the expanded
+            command is too long for the OS.  Defaults to the temp directory.
 
     Returns:
         Standardized result dict with keys ``status``, ``output``, and ``data``.
     """
-    resolved = []
-    for part in command:
-        for key, value in form_data.items():
-            part = part.replace(f"{{{key}}}", str(value))
-        resolved.append(part)
+    if not isinstance(command, CommandTemplate):
+        command = CommandTemplate(command)
+    resolved, manifests = command.render(form_data, manifest_dir)
 
     logger.debug("Running subprocess", extra={"command": resolved})
 
     try:
-        result = subprocess.run(
+        return _run_resolved(resolved, timeout, cancel_event, is_disconnected)
+    finally:
+        for path in manifests:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _run_resolved(
+    resolved: List[str],
+    timeout: Optional[float],
+    cancel_event: Optional[threading.Event],
+    is_disconnected: Optional[Callable[[], bool]],
+) -> Dict[str, Any]:
+    """Run an already-substituted argv until it exits or is stopped."""
+    try:
+        proc = _UsagePopen(
             resolved,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            timeout=timeout,
+            **_process_group_kwargs(),
         )
-        if result.returncode == 0:
-            logger.info("Subprocess completed successfully")
-            return {
-                "status": "success",
-                "output": result.stdout,
-                "data": {"returncode": result.returncode, "stderr": result.stderr},
-            }
-        else:
-            logger.error(
-                "Subprocess failed",
-                extra={"returncode": result.returncode, "stderr": result.stderr},
-            )
-            return {
-                "status": "error",
-                "output": result.stderr or result.stdout,
-                "data": {"returncode": result.returncode},
-            }
-    except subprocess.TimeoutExpired:
-        logger.error("Subprocess timed out", extra={"timeout": timeout})
+    except FileNotFoundError as exc:
+        logger.error("Subprocess executable not found", extra={"error": str(exc)})
         return {
             "status": "error",
-            "output": f"Process timed out after {timeout} seconds",
+            "output": f"Command not found: {resolved[0]}",
             "data": {},
         }
-    except FileNotFoundError as exc:
-        logger.error("Subprocess executable not found", extra={"error": str(exc)})
+    except OSError as exc:
+        # E.g. E2BIG when the arguments still exceed the OS limit.
+        logger.error("Subprocess could not be started", extra={"error": str(exc)})
         return {
             "status": "error",
-            "output": f"Command not found: {resolved[0]}",
+            "output": f"Could not start {resolved[0]}: {exc.strerror or exc}",
             "data": {},
         }
 
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    while True:
+        try:
+            stdout, stderr = proc.communicate(timeout=POLL_INTERVAL)
+            break
+        except subprocess.TimeoutExpired:
+            if cancel_event is not None and cancel_event.is_set():
+                reason = "cancelled"
+            elif is_disconnected is not None and is_disconnected():
+                reason = "disconnected"
+            elif deadline is not None and time.monotonic() >= deadline:
+                reason = "timeout"
+            else:
+                continue
+            kill_process_tree(proc)
+            return aborted_result(reason, timeout, usage=proc.usage)
+
+    if proc.returncode == 0:
+        logger.info("Subprocess completed successfully")
+        return {
+            "status": "success",
+            "output": stdout,
+            "data": {"returncode": proc.returncode, "stderr": stderr, "usage": proc.usage},
+        }
+    logger.error(
+        "Subprocess failed",
+        extra={"returncode": proc.returncode, "stderr": stderr},
+    )
+    return {
+        "status": "error",
+        "output": stderr or stdout,
+        "data": {"returncode": proc.returncode, "usage": proc.usage},
+    }
+
+
+class _UsagePopen(subprocess.Popen):
+    """Popen that records the child's resource usage when it is reaped.
+
+    ``usage`` holds ``cpu_seconds`` (user + system) and ``max_rss_kb`` once
+    the process has been waited for, and is ``None`` before that or on
+    platforms without :func:`os.wait4`.
+    """
+
+    usage: Optional[Dict[str, float]] = None
+
+    if hasattr(os, "wait4"):
+        # Popen.wait() reaps the child through _try_wait(); use wait4 there
+        # so the kernel's per-child rusage is not lost.
+        def _try_wait(self, wait_flags):
+            try:
+                pid, sts, rusage = os.wait4(self.pid, wait_flags)
+            except ChildProcessError:
+                return self.pid, 0
+            if pid:
+                maxrss = rusage.ru_maxrss
+                if sys.platform == "darwin":
+                    maxrss //= 1024  # bytes on macOS, kilobytes elsewhere
+                self.usage = {
+                    "cpu_seconds": round(rusage.ru_utime + rusage.ru_stime, 6),
+                    "max_rss_kb": maxrss,
+                }
+            return pid, sts
+
+
+def kill_process_tree(proc: "subprocess.Popen[Any]") -> None:
+    """Kill *proc* together with every process in its process group.
+
+    *proc* must have been started with :func:`_process_group_kwargs` so that
+    it leads its own group; otherwise only the direct child would be killed.
+    """
+    if os.name == "nt":
+        subprocess.run(
+            ["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+            capture_output=True,
+        )
+    else:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    # Reap the leader and release its pipes without waiting on output that
+    # a detached grandchild might still be holding open.
+    proc.wait()
+    for stream in (proc.stdout, proc.stderr):
+        if stream is not None:
+            stream.close()
+
+
+def _process_group_kwargs() -> Dict[str, Any]:
+    """Popen keyword arguments that place the child in a new process group."""
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def aborted_result(
+    reason: str,
+    timeout: Optional[float],
+    usage: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """Build the result dict for a job that was stopped before completing.
+
+    *usage* is the killed process's resource usage, when it was started.
+    """
+    if reason == "timeout":
+        logger.error("Subprocess timed out", extra={"timeout": timeout})
+        output = f"Process timed out after {timeout} seconds"
+    elif reason == "disconnected":
+        logger.warning("Client disconnected; subprocess killed")
+        output = "Process cancelled because the client disconnected"
+    else:
+        logger.warning("Subprocess cancelled")
+        output = "Process cancelled"
+    return {
+        "status": "error",
+        "output": output,
+        "data": {"cancelled": reason, "usage": usage},
+    }
+
 
 def run_callable(
     handler: Callable[..., Any],
@@ -0,0 +1,127 @@
+"""Suite mode — host many utilities in a single Flask application."""
+
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from flask import Flask, jsonify, render_template, url_for
+
+from .app_factory import (
+    Utility,
+    build_blueprint,
+    build_history_blueprint,
+    enable_template_cache,
+)
+from .history import JobHistory
+
+logger = logging.getLogger(__name__)
+
+# Names taken by the suite's own routes and the history blueprint.
+_RESERVED_PREFIXES = frozenset({"history", "metrics", "static"})
+
+
+def create_suite(
+    utilities: Dict[str, Utility],
+    title: str = "Utilities",
+    upload_folder: str = "uploaded_files",
+    max_workers: int = 4,
+    custom_css: Optional[str] = None,
+    history_db: Optional[str] = None,
+) -> Flask:
+    """Create one Flask app that serves several utilities under URL prefixes.
+
+    All utilities share the app's template environment, a single worker
+    pool and one upload store (each utility saves into its own
+    subdirectory).  Concurrency limits and metrics remain per utility.
+
+    A job waiting for a free worker already holds one of its utility's
+    ``max_concurrent`` slots and counts as active in the metrics.  Its
+    deadline runs from submission, and it is dropped without starting if
+    it is cancelled or its client disconnects while it waits.
+
+    Args:
+        utilities: Mapping of URL prefix (e.g. ``"migrate"``) to utility
+            definition.  Each utility is served under ``/<prefix>/``.
+            ``history``, ``metrics`` and ``static`` are reserved.
+        title: Heading of the index page listing all utilities.
+        upload_folder: Root directory for uploaded files.
+        max_workers: Number of worker threads shared by all utilities.
+        custom_css: Extra CSS injected into the index page ``<style>`` tag.
+        history_db: Path of a SQLite database shared by all utilities, in
+            which every execution is recorded under the utility's prefix.
+            Enables the ``/history`` and ``/history/dashboard`` pages.
+
+    Returns:
+        A configured Flask application instance.
+    """
+    if not utilities:
+        raise ValueError("At least one utility must be provided")
+
+    app = Flask(__name__)
+    app.secret_key = os.urandom(24)
+    enable_template_cache(app)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="utilities-web")
+    app.extensions["utilities_web.executor"] = executor
+
+    history = JobHistory(history_db) if history_db else None
+    if history is not None:
+        app.register_blueprint(build_history_blueprint(history))
+        app.extensions["utilities_web.history"] = history
+
+    registries = {}
+    entries = []
+    for prefix, utility in utilities.items():
+        name = _blueprint_name(prefix)
+        if name in registries:
+            raise ValueError(f"Duplicate utility prefix: {prefix!r}")
+        if name in _RESERVED_PREFIXES:
+            raise ValueError(f"Utility prefix {prefix!r} is reserved")
+        blueprint, jobs = build_blueprint(
+            name, utility, os.path.join(upload_folder, name), executor=executor,
+            history=history,
+        )
+        app.register_blueprint(blueprint, url_prefix=f"/{name}")
+        registries[name] = jobs
+        entries.append((name, utility))
+    app.extensions["utilities_web.jobs"] = registries
+
+    logger.info("Suite created", extra={"title": title, "utilities": list(registries)})
+
+    @app.context_processor
+    def inject_suite_title():
+        return {"suite_title": title}
+
+    @app.route("/")
+    def suite_index():
+        return render_template(
+            "suite.html",
+            title=title,
+            utilities=[
+                {
+                    "title": utility.title,
+                    "description": utility.description,
+                    "url": url_for(f"{name}.index"),
+                    "active": len(registries[name]),
+                }
+                for name, utility in entries
+            ],
+            custom_css=custom_css,
+            history_enabled=history is not None,
+        )
+
+    @app.route("/metrics")
+    def suite_metrics():
+        return jsonify({name: jobs.metrics() for name, jobs in registries.items()})
+
+    return app
+
+
+def _blueprint_name(prefix: str) -> str:
+    """Derive a blueprint name from a URL prefix such as ``"/csv-tools"``."""
+    name = re.sub(r"[^A-Za-z0-9_-]+", "_", prefix.strip("/")).strip("_")
+    if not name:
+        raise ValueError(f"Invalid utility prefix: {prefix!r}")
+    return name
@@ -0,0 +1,220 @@
+"""Server-side validation of form submissions, compiled from the input types."""
+
+import math
+import mimetypes
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Tuple
+
+from .input_types import CheckboxInput, FileInput, NumberInput, SelectInput, TextInput
+
+
+class _FieldError(Exception):
+    pass
+
+
+@dataclass
+class ValidationResult:
+    """Outcome of validating one submission.
+
+    Args:
+        values: Typed values for non-file fields (``int``/``float`` for
+            numbers, ``bool`` for checkboxes, ``str`` otherwise; ``None``
+            for an empty optional number or select).
+        raw: The submitted strings for the same fields, as used to build
+            command lines.
+        errors: Error message per field name, for every invalid field.
+    """
+    values: Dict[str, Any] = field(default_factory=dict)
+    raw: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+class FormValidator:
+    """Validator for a fixed list of inputs.
+
+    Everything that does not depend on the submission -- choice sets,
+    numeric bounds, accepted file types -- is worked out once here, so each
+    submission is checked with a few comparisons before any upload is saved
+    or any job is started.
+
+    Args:
+        inputs: The utility's input field definitions.
+    """
+
+    def __init__(self, inputs: List) -> None:
+        self._rules = [_compile(inp) for inp in inputs]
+
+    def validate(self, form, files) -> ValidationResult:
+        """Validate a submission.
+
+        Args:
+            form: Submitted form fields (e.g. ``request.form``).
+            files: Submitted files (e.g. ``request.files``).
+
+        Returns:
+            The typed values and every field error found.
+        """
+        result = ValidationResult()
+        for rule in self._rules:
+            try:
+                raw, value = rule.check(form, files)
+            except _FieldError as exc:
+                result.errors[rule.name] = str(exc)
+                continue
+            if raw is not _FILE:
+                result.raw[rule.name] = raw
+                result.values[rule.name] = value
+        return result
+
+
+# Marker returned by file rules; files are saved by the caller, not typed here.
+_FILE = object()
+
+
+class _FileRule:
+    def __init__(self, inp: FileInput) -> None:
+        self.name = inp.name
+        self.label = inp.label
+        self.required = inp.required
+        self.multiple = inp.multiple
+        self.max_bytes = int(inp.max_size_mb * 1024 * 1024) if inp.max_size_mb else None
+        patterns = [p.strip().lower() for p in (inp.accept or "").split(",") if p.strip()]
+        self.extensions: Tuple[str, ...] = tuple(p for p in patterns if p.startswith("."))
+        self.mime_types: Tuple[str, ...] = tuple(p for p in patterns if not p.startswith("."))
+
+    def check(self, form, files) -> Tuple[Any, Any]:
+        uploads = files.getlist(self.name) if self.multiple else [files.get(self.name)]
+        uploads = [f for f in uploads if f and f.filename]
+        if not uploads:
+            if self.required:
+                raise _FieldError(f"Missing required file: {self.label}")
+            return _FILE, None
+        for upload in uploads:
+            if not self._accepts(upload.filename):
+                raise _FieldError(f"{self.label}: file type of '{upload.filename}' is not accepted")
+            if self.max_bytes is not None and _stream_size(upload.stream) > self.max_bytes:
+                raise _FieldError(f"{self.label}: '{upload.filename}' is larger than the size limit")
+        return _FILE, None
+
+    def _accepts(self, filename: str) -> bool:
+        if not self.extensions and not self.mime_types:
+            return True
+        # Suffix match, so multi-part extensions such as ".tar.gz" work.
+        if self.extensions and filename.lower().endswith(self.extensions):
+            return True
+        guessed = mimetypes.guess_type(filename)[0]
+        if guessed is None:
+            return False
+        for pattern in self.mime_types:
+            if pattern == guessed or (pattern.endswith("/*") and guessed.startswith(pattern[:-1])):
+                return True
+        return False
+
+
+class _TextRule:
+    def __init__(self, inp: TextInput) -> None:
+        self.name = inp.name
+        self.label = inp.label
+        self.required = inp.required
+
+    def check(self, form, files) -> Tuple[Any, Any]:
+        value = form.get(self.name, "")
+        if self.required and not value:
+            raise _FieldError(f"Missing required field: {self.label}")
+        return value, value
+
+
+class _NumberRule:
+    def __init__(self, inp: NumberInput) -> None:
+        self.name = inp.name
+        self.label = inp.label
+        self.required = inp.required
+        self.min_val = float(inp.min_val) if inp.min_val is not None else None
+        self.max_val = float(inp.max_val) if inp.max_val is not None else None
+        self.step = float(inp.step) if inp.step else None
+        # As in HTML, steps count from the minimum when there is one.
+        self.step_base = self.min_val if self.min_val is not None else 0.0
+        self.integral = (
+            self.step is not None
+            and self.step.is_integer()
+            and self.step_base.is_integer()
+        )
+
+    def check(self, form, files) -> Tuple[Any, Any]:
+        text = form.get(self.name, "").strip()
+        if not text:
+            if self.required:
+                raise _FieldError(f"Missing required field: {self.label}")
+            return text, None
+        try:
+            number = float(text)
+        except ValueError:
+            raise _FieldError(f"{self.label}: '{text}' is not a number") from None
+        if not math.isfinite(number):
+            raise _FieldError(f"{self.label}: '{text}' is not a number")
+        if self.min_val is not None and number < self.min_val:
+            raise _FieldError(f"{self.label}: must be at least {_fmt(self.min_val)}")
+        if self.max_val is not None and number > self.max_val:
+            raise _FieldError(f"{self.label}: must be at most {_fmt(self.max_val)}")
+        if self.step is not None:
+            steps = (number - self.step_base) / self.step
+            if abs(steps - round(steps)) > 1e-9 * max(1.0, abs(steps)):
+                raise _FieldError(f"{self.label}: must be in steps of {_fmt(self.step)}")
+        return text, int(round(number)) if self.integral else number
+
+
+class _SelectRule:
+    def __init__(self, inp: SelectInput) -> None:
+        self.name = inp.name
+        self.label = inp.label
+        self.required = inp.required
+        self.choices: FrozenSet[str] = frozenset(str(value) for value, _ in inp.choices)
+
+    def check(self, form, files) -> Tuple[Any, Any]:
+        value = form.get(self.name, "")
+        if not value:
+            if self.required:
+                raise _FieldError(f"Missing required field: {self.label}")
+            return value, None
+        if value not in self.choices:
+            raise _FieldError(f"{self.label}: '{value}' is not one of the available choices")
+        return value, value
+
+
+class _CheckboxRule:
+    def __init__(self, inp: CheckboxInput) -> None:
+        self.name = inp.name
+
+    def check(self, form, files) -> Tuple[Any, Any]:
+        checked = self.name in form
+        return checked, checked
+
+
+def _compile(inp):
+    if isinstance(inp, FileInput):
+        return _FileRule(inp)
+    if isinstance(inp, NumberInput):
+        return _NumberRule(inp)
+    if isinstance(inp, SelectInput):
+        return _SelectRule(inp)
+    if isinstance(inp, CheckboxInput):
+        return _CheckboxRule(inp)
+    return _TextRule(inp)
+
+
+def _stream_size(stream) -> int:
+    """Return the size of an uploaded file's stream without reading it."""
+    position = stream.tell()
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(position)
+    return size
+
+
+def _fmt(number: float) -> str:
+    return str(int(number)) if number.is_integer() else str(number)
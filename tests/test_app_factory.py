@@ -1,10 +1,16 @@
 """Tests for utilities_web.app_factory — create_app and Flask routes."""
 
+import io
+import re
+import sys
+import threading
+import zipfile
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 from utilities_web import create_app, TextInput
+from utilities_web.app_factory import _job_timeout
 
 
 # ---------------------------------------------------------------------------
@@ -72,3 +78,426 @@ class TestPostWithHandler:
             # Missing required field triggers a redirect back to the form
             assert response.status_code == 302
             assert "/" in response.headers["Location"]
+
+
+# ---------------------------------------------------------------------------
+# Deadlines and cancellation
+# ---------------------------------------------------------------------------
+
+class TestJobTimeout:
+    def test_app_timeout_used_when_no_request(self):
+        assert _job_timeout(30, None) == 30
+
+    def test_request_can_shorten_deadline(self):
+        assert _job_timeout(30, "5") == 5
+
+    def test_request_cannot_extend_deadline(self):
+        assert _job_timeout(30, "500") == 30
+
+    def test_request_used_without_app_timeout(self):
+        assert _job_timeout(None, "5") == 5
+
+    def test_invalid_request_ignored(self):
+        assert _job_timeout(30, "soon") == 30
+        assert _job_timeout(30, "-1") == 30
+
+
+class TestCancelJob:
+    def test_form_includes_job_id(self):
+        app = create_app(title="T", process_command=["true"])
+        with app.test_client() as client:
+            html = client.get("/").data.decode()
+            assert 'name="_job_id"' in html
+            assert "/cancel/" in html
+            assert 'id="cancel-btn"' in html
+
+    def test_handler_form_has_no_cancel_button(self):
+        app = create_app(title="T", process_handler=lambda: None)
+        with app.test_client() as client:
+            html = client.get("/").data.decode()
+            assert "/cancel/" not in html
+            assert 'id="cancel-btn"' not in html
+
+    def test_cancel_handler_job_refused(self):
+        app = create_app(title="T", process_handler=lambda: None)
+        jobs = app.extensions["utilities_web.jobs"]
+        event = jobs.start("job1")
+        with app.test_client() as client:
+            response = client.post("/cancel/job1")
+            assert response.status_code == 409
+            assert response.get_json()["cancelled"] is False
+        assert not event.is_set()
+
+    def test_cancel_unknown_job_returns_404(self):
+        app = create_app(title="T", process_handler=lambda: None)
+        with app.test_client() as client:
+            response = client.post("/cancel/nope")
+            assert response.status_code == 404
+            assert response.get_json()["cancelled"] is False
+
+    def test_cancel_running_job(self):
+        app = create_app(title="T", process_command=["true"])
+        jobs = app.extensions["utilities_web.jobs"]
+        event = jobs.start("job1")
+        with app.test_client() as client:
+            response = client.post("/cancel/job1")
+            assert response.status_code == 200
+            assert response.get_json()["cancelled"] is True
+        assert event.is_set()
+
+    def test_command_job_respects_app_timeout(self):
+        app = create_app(
+            title="T",
+            process_command=[sys.executable, "-c", "import time; time.sleep(30)"],
+            timeout=0.5,
+        )
+        with app.test_client() as client:
+            response = client.post("/", data={"_job_id": "job1"})
+            assert response.status_code == 200
+            assert "timed out" in response.data.decode()
+        assert "job1" not in app.extensions["utilities_web.jobs"]
+
+
+# ---------------------------------------------------------------------------
+# Concurrency limits and metrics
+# ---------------------------------------------------------------------------
+
+class TestLimitsAndMetrics:
+    def test_submission_rejected_at_capacity(self):
+        app = create_app(
+            title="Busy",
+            process_handler=lambda **kw: "ran",
+            max_concurrent=1,
+        )
+        app.extensions["utilities_web.jobs"].start("running")
+        with app.test_client() as client:
+            response = client.post("/", data={})
+            assert response.status_code == 302
+            assert "busy" in client.get("/").data.decode()
+
+    def test_overlapping_submissions_with_same_job_id(self):
+        release = threading.Event()
+        app = create_app(
+            title="Slow",
+            process_handler=lambda **kw: release.wait(5) and "ran",
+            max_concurrent=2,
+        )
+        jobs = app.extensions["utilities_web.jobs"]
+        responses = []
+
+        def submit():
+            with app.test_client() as client:
+                responses.append(client.post("/", data={"_job_id": "samejob"}))
+
+        first = threading.Thread(target=submit)
+        first.start()
+        for _ in range(100):
+            if "samejob" in jobs:
+                break
+            threading.Event().wait(0.05)
+
+        with app.test_client() as client:
+            second = client.post("/", data={"_job_id": "samejob"})
+            assert second.status_code == 302
+            assert "already submitted" in client.get("/").data.decode()
+        assert jobs.metrics()["active"] == 1
+
+        release.set()
+        first.join(5)
+        assert responses[0].status_code == 200
+        metrics = jobs.metrics()
+        assert metrics["active"] == 0
+        assert metrics["started"] == 1
+        assert metrics["succeeded"] == 1
+
+    def test_metrics_count_outcomes(self):
+        app = create_app(title="M", process_handler=lambda **kw: "ran")
+        with app.test_client() as client:
+            client.post("/", data={})
+            metrics = client.get("/metrics").get_json()
+            assert metrics["started"] == 1
+            assert metrics["succeeded"] == 1
+            assert metrics["active"] == 0
+
+
+class TestCommandTemplateValidation:
+    def test_unknown_placeholder_fails_at_startup(self):
+        with pytest.raises(ValueError, match="Unknown placeholder"):
+            create_app(
+                title="T",
+                inputs=[TextInput("name")],
+                process_command=["echo", "{nmae}"],
+            )
+
+
+# ---------------------------------------------------------------------------
+# Job history
+# ---------------------------------------------------------------------------
+
+class TestHistory:
+    def _app(self, tmp_path):
+        app = create_app(
+            title="Recorder",
+            inputs=[TextInput("word")],
+            process_handler=lambda word: word,
+            upload_folder=str(tmp_path / "up"),
+            history_db=str(tmp_path / "history.db"),
+        )
+        app.config["TESTING"] = True
+        return app
+
+    def test_jobs_are_recorded(self, tmp_path):
+        app = self._app(tmp_path)
+        with app.test_client() as client:
+            client.post("/", data={"word": "hi", "_job_id": "abc"})
+        rows = app.extensions["utilities_web.history"].page()
+        assert len(rows) == 1
+        assert rows[0]["utility"] == "Recorder"
+        assert rows[0]["job_id"] == "abc"
+        assert rows[0]["status"] == "success"
+        assert rows[0]["cpu_seconds"] is not None
+
+    def test_history_and_dashboard_pages(self, tmp_path):
+        app = self._app(tmp_path)
+        with app.test_client() as client:
+            assert "Job history" in client.get("/").data.decode()
+            client.post("/", data={"word": "hi"})
+            assert "Recorder" in client.get("/history").data.decode()
+            assert "p95" in client.get("/history/dashboard").data.decode()
+            summary = client.get("/history/dashboard?format=json").get_json()
+            assert summary["Recorder"][0]["jobs"] == 1
+
+    def test_separate_apps_share_one_database(self, tmp_path):
+        db = str(tmp_path / "history.db")
+        apps = [
+            create_app(
+                title=title, process_handler=lambda: "ok",
+                upload_folder=str(tmp_path / "up"), history_db=db,
+            )
+            for title in ("Alpha", "Beta")
+        ]
+        for app in apps:
+            with app.test_client() as client:
+                client.post("/", data={})
+        history = apps[1].extensions["utilities_web.history"]
+        assert history.utilities() == ["Alpha", "Beta"]
+        assert history.summary("Alpha")[0]["jobs"] == 1
+
+    def test_explicit_history_name(self, tmp_path):
+        app = create_app(
+            title="Profile Migration", name="migrate", process_handler=lambda: "ok",
+            upload_folder=str(tmp_path / "up"), history_db=str(tmp_path / "h.db"),
+        )
+        with app.test_client() as client:
+            client.post("/", data={})
+            assert 'href="/history?utility=migrate"' in client.get("/").data.decode()
+        assert app.extensions["utilities_web.history"].utilities() == ["migrate"]
+
+    def test_history_disabled_by_default(self):
+        app = create_app(title="T", process_handler=lambda: None)
+        with app.test_client() as client:
+            assert client.get("/history").status_code == 404
+
+
+# ---------------------------------------------------------------------------
+# Result artifacts
+# ---------------------------------------------------------------------------
+
+class TestArtifacts:
+    def test_handler_artifacts_listed_with_zip(self, tmp_path):
+        out = tmp_path / "out"
+        out.mkdir()
+        (out / "a.csv").write_text("a")
+        (out / "b.csv").write_text("b")
+        app = create_app(
+            title="Multi",
+            process_handler=lambda: {
+                "status": "success", "output": "", "data": {"artifacts": ["a.csv", "b.csv"]},
+            },
+            upload_folder=str(tmp_path / "up"),
+            output_folder=str(out),
+        )
+        with app.test_client() as client:
+            html = client.post("/", data={}).data.decode()
+            assert "/download-result/a.csv" in html
+            assert "/download-result/b.csv" in html
+            assert "Download all" in html
+
+            response = client.get("/download-all?file=a.csv&file=b.csv")
+            assert response.mimetype == "application/zip"
+            assert "Multi.zip" in response.headers["Content-Disposition"]
+            with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+                assert archive.namelist() == ["a.csv", "b.csv"]
+
+    def test_command_output_dir_placeholder(self, tmp_path):
+        out = tmp_path / "out"
+        script = (
+            "import os, sys\n"
+            "for name in ('x.txt', 'y.txt'):\n"
+            "    open(os.path.join(sys.argv[1], name), 'w').write(name)\n"
+        )
+        app = create_app(
+            title="Writer",
+            process_command=[sys.executable, "-c", script, "{output_dir}"],
+            upload_folder=str(tmp_path / "up"),
+            output_folder=str(out),
+        )
+        with app.test_client() as client:
+            html = client.post("/", data={"_job_id": "job42"}).data.decode()
+            job_dir = re.search(r"/download-all\?dir=(job42-\w+)", html).group(1)
+            assert f"/download-result/{job_dir}/x.txt" in html
+
+            response = client.get(f"/download-all?dir={job_dir}")
+            with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+                assert archive.namelist() == ["x.txt", "y.txt"]
+                assert archive.read("y.txt") == b"y.txt"
+            assert client.get(f"/download-result/{job_dir}/x.txt").data == b"x.txt"
+
+    def test_download_all_dir_limited_to_one_job(self, tmp_path):
+        out = tmp_path / "out"
+        for job, name in [("jobA", "secret.csv"), ("jobB", "other.csv")]:
+            (out / job).mkdir(parents=True)
+            (out / job / name).write_text("x")
+        app = create_app(
+            process_handler=lambda: None,
+            upload_folder=str(tmp_path / "up"),
+            output_folder=str(out),
+        )
+        with app.test_client() as client:
+            for subdir in [".", "", "..", "jobA/..", "../out/jobA/..", str(out), "/etc"]:
+                response = client.get("/download-all", query_string={"dir": subdir})
+                assert response.status_code == 302, subdir
+            response = client.get("/download-all?dir=jobA")
+            with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+                assert archive.namelist() == ["secret.csv"]
+
+    @pytest.mark.parametrize("subdir", ["run.2024", "reports/today", "absolute"])
+    def test_handler_output_dir_zip_link_works(self, tmp_path, subdir):
+        out = tmp_path / "out"
+        target = out / "reports" / "today" if subdir == "reports/today" else out / "run.2024"
+        target.mkdir(parents=True)
+        (target / "a.csv").write_text("a")
+        (target / "b.csv").write_text("b")
+        output_dir = str(target) if subdir == "absolute" else subdir
+        app = create_app(
+            process_handler=lambda: {"status": "success", "output": "", "data": {"output_dir": output_dir}},
+            upload_folder=str(tmp_path / "up"),
+            output_folder=str(out),
+        )
+        with app.test_client() as client:
+            html = client.post("/", data={}).data.decode()
+            zip_url = re.search(r'href="(/download-all\?[^"]+)"', html).group(1)
+            response = client.get(zip_url.replace("&amp;", "&"))
+            assert response.mimetype == "application/zip"
+            with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+                assert archive.namelist() == ["a.csv", "b.csv"]
+
+    def test_reused_job_id_gets_fresh_output_dir(self, tmp_path):
+        out = tmp_path / "out"
+        script = "import os, sys, time; open(os.path.join(sys.argv[1], str(time.time())), 'w')"
+        app = create_app(
+            title="Writer",
+            process_command=[sys.executable, "-c", script, "{output_dir}"],
+            upload_folder=str(tmp_path / "up"),
+            output_folder=str(out),
+        )
+        with app.test_client() as client:
+            client.post("/", data={"_job_id": "again"})
+            client.post("/", data={"_job_id": "again"})
+        job_dirs = sorted(out.iterdir())
+        assert len(job_dirs) == 2
+        assert all(len(list(d.iterdir())) == 1 for d in job_dirs)
+
+    def test_unsafe_job_id_replaced(self, tmp_path):
+        out = tmp_path / "out"
+        app = create_app(
+            title="Writer",
+            process_command=[sys.executable, "-c", "pass", "{output_dir}"],
+            upload_folder=str(tmp_path / "up"),
+            output_folder=str(out),
+        )
+        with app.test_client() as client:
+            client.post("/", data={"_job_id": "../escape"})
+        assert not (tmp_path / "escape").exists()
+
+    def test_output_dir_input_name_reserved(self, tmp_path):
+        with pytest.raises(ValueError, match="reserved"):
+            create_app(
+                inputs=[TextInput("output_dir")],
+                process_command=["echo", "{output_dir}"],
+                output_folder=str(tmp_path),
+            )
+
+    def test_download_all_without_files_redirects(self, tmp_path):
+        app = create_app(
+            process_handler=lambda: None,
+            upload_folder=str(tmp_path / "up"),
+            output_folder=str(tmp_path),
+        )
+        with app.test_client() as client:
+            assert client.get("/download-all?file=../x").status_code == 302
+
+
+# ---------------------------------------------------------------------------
+# Server-side validation
+# ---------------------------------------------------------------------------
+
+class TestValidation:
+    def test_all_errors_flashed_and_nothing_saved(self, tmp_path):
+        from utilities_web import FileInput, NumberInput, SelectInput
+
+        handler = MagicMock(return_value="ran")
+        upload = tmp_path / "up"
+        app = create_app(
+            title="V",
+            inputs=[
+                FileInput("f", accept=".csv"),
+                NumberInput("n", label="Count", min_val=1, max_val=5, step=1),
+                SelectInput("s", label="Mode", choices=["fast", "slow"]),
+            ],
+            process_handler=handler,
+            upload_folder=str(upload),
+        )
+        with app.test_client() as client:
+            response = client.post(
+                "/",
+                data={"f": (io.BytesIO(b"x"), "ok.csv"), "n": "9", "s": "medium"},
+                content_type="multipart/form-data",
+            )
+            assert response.status_code == 302
+            html = client.get("/").data.decode()
+            assert "Count: must be at most 5" in html
+            assert "Mode: &#39;medium&#39; is not one of the available choices" in html
+        handler.assert_not_called()
+        assert list(upload.iterdir()) == []
+        assert app.extensions["utilities_web.jobs"].metrics()["started"] == 0
+
+    def test_handler_receives_typed_values(self, tmp_path):
+        from utilities_web import CheckboxInput, NumberInput
+
+        handler = MagicMock(return_value="ran")
+        app = create_app(
+            inputs=[
+                NumberInput("count", step=1),
+                NumberInput("ratio"),
+                CheckboxInput("flag"),
+            ],
+            process_handler=handler,
+            upload_folder=str(tmp_path / "up"),
+        )
+        with app.test_client() as client:
+            client.post("/", data={"count": "3", "ratio": "0.5", "flag": "true"})
+        handler.assert_called_once_with(count=3, ratio=0.5, flag=True)
+
+    def test_command_receives_submitted_strings(self, tmp_path):
+        from utilities_web import NumberInput
+
+        app = create_app(
+            inputs=[NumberInput("ratio")],
+            process_command=[sys.executable, "-c", "import sys; print(sys.argv[1])", "{ratio}"],
+            upload_folder=str(tmp_path / "up"),
+        )
+        with app.test_client() as client:
+            html = client.post("/", data={"ratio": "10"}).data.decode()
+        assert "10.0" not in html
+        assert ">10\n<" in html
@@ -0,0 +1,65 @@
+"""Tests for utilities_web.artifacts — artifact resolution and ZIP streaming."""
+
+import io
+import os
+import zipfile
+
+from utilities_web.artifacts import iter_zip, resolve_artifacts
+
+
+def _write(path, data=b"x"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+class TestResolveArtifacts:
+    def test_download_file_artifacts_and_output_dir(self, tmp_path):
+        _write(tmp_path / "single.csv")
+        _write(tmp_path / "a.txt")
+        _write(tmp_path / "job" / "z.csv")
+        _write(tmp_path / "job" / "sub" / "b.csv")
+        data = {
+            "download_file": "single.csv",
+            "artifacts": ["a.txt", "single.csv"],
+            "output_dir": "job",
+        }
+        assert resolve_artifacts(data, str(tmp_path)) == [
+            "single.csv", "a.txt", "job/z.csv", "job/sub/b.csv",
+        ]
+
+    def test_absolute_paths_inside_output_folder(self, tmp_path):
+        path = _write(tmp_path / "out.csv")
+        assert resolve_artifacts({"artifacts": [str(path)]}, str(tmp_path)) == ["out.csv"]
+
+    def test_paths_outside_output_folder_skipped(self, tmp_path):
+        outside = _write(tmp_path / "secret.txt")
+        out = tmp_path / "out"
+        out.mkdir()
+        data = {"artifacts": ["../secret.txt", str(outside)], "output_dir": ".."}
+        assert resolve_artifacts(data, str(out)) == []
+
+    def test_missing_files_and_no_output_folder(self, tmp_path):
+        assert resolve_artifacts({"artifacts": ["nope.csv"]}, str(tmp_path)) == []
+        assert resolve_artifacts({"download_file": "x"}, None) == []
+        assert resolve_artifacts(None, str(tmp_path)) == []
+
+
+class TestIterZip:
+    def test_round_trip(self, tmp_path):
+        text = _write(tmp_path / "report.csv", b"a,b\n" * 50_000)
+        image = _write(tmp_path / "chart.png", os.urandom(10_000))
+        chunks = list(iter_zip([(str(text), "report.csv"), (str(image), "img/chart.png")], 4096))
+        assert len(chunks) > 2
+
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+            assert archive.namelist() == ["report.csv", "img/chart.png"]
+            assert archive.read("report.csv") == text.read_bytes()
+            assert archive.read("img/chart.png") == image.read_bytes()
+            assert archive.getinfo("report.csv").compress_type == zipfile.ZIP_DEFLATED
+            assert archive.getinfo("img/chart.png").compress_type == zipfile.ZIP_STORED
+
+    def test_chunks_stay_bounded(self, tmp_path):
+        big = _write(tmp_path / "big.bin.gz", os.urandom(1024 * 1024))
+        chunks = list(iter_zip([(str(big), "big.bin.gz")], 16 * 1024))
+        assert max(len(chunk) for chunk in chunks) <= 64 * 1024
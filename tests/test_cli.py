@@ -0,0 +1,117 @@
+"""Tests for utilities_web.cli and package start-up behaviour."""
+
+import subprocess
+import sys
+import threading
+import urllib.request
+from unittest.mock import patch
+
+import pytest
+
+from utilities_web import cli
+
+
+class TestLazyImports:
+    def test_package_import_does_not_load_flask(self):
+        out = subprocess.run(
+            [sys.executable, "-c", "import sys, utilities_web; print('flask' in sys.modules)"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert out.stdout.strip() == "False"
+
+    def test_lazy_names_resolve(self):
+        import utilities_web
+        from utilities_web.app_factory import create_app
+
+        assert utilities_web.create_app is create_app
+        assert "create_suite" in dir(utilities_web)
+
+    def test_unknown_attribute_raises(self):
+        import utilities_web
+
+        with pytest.raises(AttributeError):
+            utilities_web.does_not_exist
+
+
+class TestLoadApp:
+    def test_loads_module_attribute(self, tmp_path, monkeypatch):
+        (tmp_path / "my_tool.py").write_text("app = 'the app'\nother = 'other app'\n")
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(sys, "path", list(sys.path))
+        assert cli.load_app("my_tool:other") == "other app"
+        assert cli.load_app("my_tool") == "the app"
+
+    def test_missing_attribute(self, tmp_path, monkeypatch):
+        (tmp_path / "my_tool2.py").write_text("x = 1\n")
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(sys, "path", list(sys.path))
+        with pytest.raises(ValueError, match="no attribute 'app'"):
+            cli.load_app("my_tool2")
+
+
+class TestWarmApp:
+    def test_compiles_templates_into_bytecode_cache(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("UTILITIES_WEB_TEMPLATE_CACHE", str(tmp_path / "cache"))
+        from utilities_web import create_app
+
+        app = create_app(process_handler=lambda: None, upload_folder=str(tmp_path / "up"))
+        cli.warm_app(app)
+        assert len(list((tmp_path / "cache").iterdir())) >= 3
+
+
+class TestPooledServer:
+    def test_requests_limited_to_thread_count(self):
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def app(environ, start_response):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            threading.Event().wait(0.2)
+            with lock:
+                active.pop()
+            start_response("200 OK", [("Content-Type", "text/plain")])
+            return [b"ok"]
+
+        server = cli.make_pooled_server("127.0.0.1", 0, app, threads=2)
+        serving = threading.Thread(target=server.serve_forever)
+        serving.start()
+        try:
+            url = f"http://127.0.0.1:{server.port}/"
+            bodies = []
+            clients = [
+                threading.Thread(target=lambda: bodies.append(urllib.request.urlopen(url).read()))
+                for _ in range(6)
+            ]
+            for client in clients:
+                client.start()
+            for client in clients:
+                client.join(10)
+        finally:
+            server.shutdown()
+            serving.join(5)
+            server.server_close()
+        assert bodies == [b"ok"] * 6
+        assert max(peak) == 2
+
+
+class TestMain:
+    def test_serve_loads_warms_and_serves(self):
+        with patch.object(cli, "load_app", return_value="app") as load, \
+                patch.object(cli, "warm_app") as warm, \
+                patch.object(cli, "serve") as serve:
+            assert cli.main(["serve", "tool:app", "--port", "9000"]) == 0
+        load.assert_called_once_with("tool:app")
+        warm.assert_called_once_with("app")
+        serve.assert_called_once_with("app", "127.0.0.1", 9000, 8)
+
+    def test_no_warm_flag(self):
+        with patch.object(cli, "load_app", return_value="app"), \
+                patch.object(cli, "warm_app") as warm, \
+                patch.object(cli, "serve"):
+            cli.main(["serve", "tool:app", "--no-warm"])
+        warm.assert_not_called()
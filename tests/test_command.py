@@ -0,0 +1,78 @@
+"""Tests for utilities_web.command — CommandTemplate compilation and rendering."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from utilities_web.command import CommandTemplate
+
+
+class TestCompile:
+    def test_unknown_placeholder_rejected(self):
+        with pytest.raises(ValueError, match=r"Unknown placeholder \{typo\}"):
+            CommandTemplate(["run", "{typo}"], fields=["name"])
+
+    def test_escaped_placeholder_is_literal(self):
+        template = CommandTemplate(["{{name}}", "{name}"], fields=["name"])
+        argv, _ = template.render({"name": "a"})
+        assert argv == ["{name}", "a"]
+
+    def test_other_braces_pass_through(self):
+        command = ["find", ".", "-exec", "echo", "{}", ";", '{"a": {"b": 1}}', "print({'x': 1})"]
+        template = CommandTemplate(command, fields=["name"])
+        assert template.render({"name": "a"})[0] == command
+
+    def test_field_name_with_spaces(self):
+        template = CommandTemplate(["{input file}"], fields=["input file"])
+        assert template.render({"input file": "up/a.csv"})[0] == ["up/a.csv"]
+
+    def test_dotted_field_names(self):
+        template = CommandTemplate(["{config.json}"], fields=["config.json"])
+        assert template.render({"config.json": "up/config.json"})[0] == ["up/config.json"]
+
+    def test_unvalidated_template_passes_unknown_through(self):
+        template = CommandTemplate(["echo", "{missing}"])
+        assert template.render({})[0] == ["echo", "{missing}"]
+
+
+class TestRender:
+    def test_scalar_substitution(self):
+        template = CommandTemplate(["--n={count}", "{name}"], fields=["count", "name"])
+        assert template.render({"count": 3, "name": "x"})[0] == ["--n=3", "x"]
+
+    def test_list_expands_to_separate_args(self):
+        template = CommandTemplate(["cat", "{files}"], fields=["files"])
+        argv, manifests = template.render({"files": ["a.csv", "b.csv"]})
+        assert argv == ["cat", "a.csv", "b.csv"]
+        assert manifests == []
+
+    def test_list_expands_with_affixes(self):
+        template = CommandTemplate(["--in={files}"], fields=["files"])
+        assert template.render({"files": ["a", "b"]})[0] == ["--in=a", "--in=b"]
+
+    def test_empty_list_drops_argument(self):
+        template = CommandTemplate(["cat", "{files}", "end"], fields=["files"])
+        assert template.render({"files": []})[0] == ["cat", "end"]
+
+    def test_known_field_without_value_renders_empty(self):
+        template = CommandTemplate(["run", "{optional}"], fields=["optional"])
+        assert template.render({})[0] == ["run", ""]
+
+    def test_two_list_fields_in_one_part_rejected(self):
+        template = CommandTemplate(["{a}:{b}"], fields=["a", "b"])
+        with pytest.raises(ValueError, match="combines list fields"):
+            template.render({"a": ["1"], "b": ["2"]})
+
+    def test_oversized_list_moves_to_argfile(self, tmp_path):
+        template = CommandTemplate(["cat", "{files}", "{name}"], fields=["files", "name"])
+        files = [f"file_{i}.csv" for i in range(100)]
+        with patch("utilities_web.command.arg_max", return_value=200):
+            argv, manifests = template.render(
+                {"files": files, "name": "n"}, manifest_dir=str(tmp_path)
+            )
+        assert len(manifests) == 1
+        assert argv == ["cat", f"@{manifests[0]}", "n"]
+        with open(manifests[0], encoding="utf-8") as fh:
+            assert fh.read().splitlines() == files
+        assert os.path.dirname(manifests[0]) == str(tmp_path)
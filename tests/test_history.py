@@ -0,0 +1,82 @@
+"""Tests for utilities_web.history — JobHistory storage and summaries."""
+
+import pytest
+
+from utilities_web.history import (
+    BIN_GROWTH,
+    JobHistory,
+    bin_value,
+    duration_bin,
+)
+
+NOW = 1_700_000_000.0
+
+
+@pytest.fixture
+def history(tmp_path):
+    store = JobHistory(str(tmp_path / "history.db"))
+    yield store
+    store.close()
+
+
+class TestHelpers:
+    def test_bin_round_trip_is_within_growth(self):
+        for duration in (0.005, 0.25, 3.0, 600.0):
+            assert abs(bin_value(duration_bin(duration)) / duration - 1) < BIN_GROWTH - 1
+
+    def test_sub_millisecond_durations_share_first_bin(self):
+        assert duration_bin(0.0) == duration_bin(0.0005) == 0
+
+
+class TestRecordAndPage:
+    def test_page_is_newest_first(self, history):
+        ids = [history.record("a", f"j{i}", NOW + i, 1.0, "success") for i in range(3)]
+        assert [row["id"] for row in history.page()] == ids[::-1]
+
+    def test_keyset_pagination(self, history):
+        for i in range(5):
+            history.record("a", f"j{i}", NOW + i, 1.0, "success")
+        first = history.page(limit=2)
+        second = history.page(before=first[-1]["id"], limit=2)
+        third = history.page(before=second[-1]["id"], limit=2)
+        assert [r["job_id"] for r in first + second + third] == ["j4", "j3", "j2", "j1", "j0"]
+
+    def test_filter_by_utility(self, history):
+        history.record("a", "j1", NOW, 1.0, "success")
+        history.record("b", "j2", NOW, 1.0, "success", input_files=2, input_bytes=10)
+        rows = history.page(utility="b")
+        assert len(rows) == 1
+        assert rows[0]["input_files"] == 2
+        assert rows[0]["input_bytes"] == 10
+        assert history.utilities() == ["a", "b"]
+
+
+class TestSummary:
+    def test_percentiles_and_rates(self, history):
+        # 100 jobs lasting 1..100 seconds, two of which failed.
+        for i in range(1, 101):
+            status = "error" if i in (10, 20) else "success"
+            history.record("a", f"j{i}", NOW - 60, float(i), status)
+        history.record("a", "c", NOW - 60, 5.0, "cancelled")
+
+        day = history.summary("a", now=NOW)[0]
+        assert day["window"] == "24 hours"
+        assert day["jobs"] == 101
+        assert day["cancelled"] == 1
+        assert day["error_rate"] == pytest.approx(2 / 101)
+        assert day["per_hour"] == pytest.approx(101 / 24)
+        assert day["p50"] == pytest.approx(50, rel=BIN_GROWTH - 1)
+        assert day["p95"] == pytest.approx(95, rel=BIN_GROWTH - 1)
+        assert day["p99"] == pytest.approx(99, rel=BIN_GROWTH - 1)
+
+    def test_old_jobs_fall_out_of_short_windows(self, history):
+        history.record("a", "old", NOW - 3 * 24 * 3600, 1.0, "success")
+        day, week, _ = history.summary("a", now=NOW)
+        assert day["jobs"] == 0
+        assert day["p50"] is None
+        assert week["jobs"] == 1
+
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "h.db")
+        JobHistory(path).record("a", "j", NOW, 1.0, "success")
+        assert len(JobHistory(path).page()) == 1
@@ -0,0 +1,82 @@
+"""Tests for utilities_web.jobs — JobRegistry and job ids."""
+
+import pytest
+
+from utilities_web.jobs import JobRegistry, job_status, new_job_id
+
+
+class TestNewJobId:
+    def test_ids_are_unique(self):
+        assert new_job_id() != new_job_id()
+
+    def test_ids_are_url_safe(self):
+        assert new_job_id().isalnum()
+
+
+class TestJobStatus:
+    def test_job_status(self):
+        assert job_status({"status": "success", "data": {}}) == "success"
+        assert job_status({"status": "error", "data": {}}) == "error"
+        assert job_status({"status": "error", "data": {"cancelled": "timeout"}}) == "timeout"
+        assert job_status({"status": "error", "data": None}) == "error"
+
+
+class TestJobRegistry:
+    def test_start_registers_job(self):
+        jobs = JobRegistry()
+        event = jobs.start("abc")
+        assert "abc" in jobs
+        assert not event.is_set()
+
+    def test_cancel_sets_event(self):
+        jobs = JobRegistry()
+        event = jobs.start("abc")
+        assert jobs.cancel("abc") is True
+        assert event.is_set()
+
+    def test_cancel_unknown_job(self):
+        jobs = JobRegistry()
+        assert jobs.cancel("missing") is False
+
+    def test_finish_forgets_job(self):
+        jobs = JobRegistry()
+        jobs.start("abc")
+        jobs.finish("abc")
+        assert "abc" not in jobs
+        assert len(jobs) == 0
+        assert jobs.cancel("abc") is False
+
+    def test_start_rejects_at_capacity(self):
+        jobs = JobRegistry(max_concurrent=1)
+        assert jobs.start("a") is not None
+        assert jobs.start("b") is None
+        jobs.finish("a")
+        assert jobs.start("b") is not None
+        assert jobs.metrics()["rejected"] == 1
+
+    def test_start_refuses_running_id(self):
+        jobs = JobRegistry(max_concurrent=2)
+        first = jobs.start("same")
+        with pytest.raises(ValueError, match="already running"):
+            jobs.start("same")
+        assert jobs.metrics()["active"] == 1
+        assert jobs.cancel("same") is True
+        assert first.is_set()
+
+    def test_finish_records_outcome(self):
+        jobs = JobRegistry()
+        for job_id, result in [
+            ("ok", {"status": "success", "output": "", "data": {}}),
+            ("bad", {"status": "error", "output": "", "data": {}}),
+            ("late", {"status": "error", "output": "", "data": {"cancelled": "timeout"}}),
+            ("stop", {"status": "error", "output": "", "data": {"cancelled": "cancelled"}}),
+            ("gone", {"status": "error", "output": "", "data": {"cancelled": "disconnected"}}),
+        ]:
+            jobs.start(job_id)
+            jobs.finish(job_id, result)
+        metrics = jobs.metrics()
+        assert metrics["started"] == 5
+        assert metrics["succeeded"] == 1
+        assert metrics["failed"] == 2
+        assert metrics["cancelled"] == 2
+        assert metrics["active"] == 0
@@ -1,10 +1,17 @@
 """Tests for utilities_web.processor — run_subprocess and run_callable."""
 
+import errno
+import os
+import shutil
 import subprocess
+import sys
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from utilities_web.command import CommandTemplate
 from utilities_web.processor import run_callable, run_subprocess
 
 
@@ -12,59 +19,127 @@ from utilities_web.processor import run_callable, run_subprocess
 # run_subprocess
 # ---------------------------------------------------------------------------
 
+def _mock_popen(mock_popen, returncode=0, stdout="", stderr=""):
+    proc = mock_popen.return_value
+    proc.communicate.return_value = (stdout, stderr)
+    proc.returncode = returncode
+    return proc
+
+
 class TestRunSubprocess:
     def test_placeholder_substitution(self):
         """Placeholders like {field} are replaced with form_data values."""
-        with patch("utilities_web.processor.subprocess.run") as mock_run:
-            mock_run.return_value = MagicMock(
-                returncode=0, stdout="ok", stderr=""
-            )
+        with patch("utilities_web.processor._UsagePopen") as mock_popen:
+            _mock_popen(mock_popen, stdout="ok")
             run_subprocess(
                 ["echo", "{greeting}", "{name}"],
                 {"greeting": "hello", "name": "world"},
             )
-            mock_run.assert_called_once_with(
-                ["echo", "hello", "world"],
-                capture_output=True,
-                text=True,
-                timeout=None,
-            )
+            assert mock_popen.call_args.args[0] == ["echo", "hello", "world"]
+
+    def test_child_runs_in_own_process_group(self):
+        with patch("utilities_web.processor._UsagePopen") as mock_popen:
+            _mock_popen(mock_popen)
+            run_subprocess(["cmd"], {})
+            kwargs = mock_popen.call_args.kwargs
+            if os.name == "nt":
+                assert kwargs["creationflags"] & subprocess.CREATE_NEW_PROCESS_GROUP
+            else:
+                assert kwargs["start_new_session"] is True
 
     def test_success_when_returncode_zero(self):
-        with patch("utilities_web.processor.subprocess.run") as mock_run:
-            mock_run.return_value = MagicMock(
-                returncode=0, stdout="output text", stderr=""
-            )
+        with patch("utilities_web.processor._UsagePopen") as mock_popen:
+            _mock_popen(mock_popen, returncode=0, stdout="output text")
             result = run_subprocess(["cmd"], {})
             assert result["status"] == "success"
             assert result["output"] == "output text"
             assert result["data"]["returncode"] == 0
 
     def test_error_when_returncode_nonzero(self):
-        with patch("utilities_web.processor.subprocess.run") as mock_run:
-            mock_run.return_value = MagicMock(
-                returncode=1, stdout="", stderr="something failed"
-            )
+        with patch("utilities_web.processor._UsagePopen") as mock_popen:
+            _mock_popen(mock_popen, returncode=1, stderr="something failed")
             result = run_subprocess(["cmd"], {})
             assert result["status"] == "error"
             assert result["output"] == "something failed"
             assert result["data"]["returncode"] == 1
 
     def test_timeout_expired(self):
-        with patch("utilities_web.processor.subprocess.run") as mock_run:
-            mock_run.side_effect = subprocess.TimeoutExpired(cmd="cmd", timeout=5)
-            result = run_subprocess(["cmd"], {}, timeout=5)
-            assert result["status"] == "error"
-            assert "timed out" in result["output"]
+        result = run_subprocess(
+            [sys.executable, "-c", "import time; time.sleep(30)"], {}, timeout=0.3
+        )
+        assert result["status"] == "error"
+        assert "timed out" in result["output"]
+        assert result["data"]["cancelled"] == "timeout"
 
     def test_file_not_found(self):
-        with patch("utilities_web.processor.subprocess.run") as mock_run:
-            mock_run.side_effect = FileNotFoundError("No such file")
+        with patch("utilities_web.processor._UsagePopen") as mock_popen:
+            mock_popen.side_effect = FileNotFoundError("No such file")
             result = run_subprocess(["nonexistent_binary"], {})
             assert result["status"] == "error"
             assert "Command not found" in result["output"]
             assert "nonexistent_binary" in result["output"]
 
+    def test_oserror_on_start_returns_error(self):
+        with patch("utilities_web.processor._UsagePopen") as mock_popen:
+            mock_popen.side_effect = OSError(errno.E2BIG, "Argument list too long")
+            result = run_subprocess(["cmd"], {})
+            assert result["status"] == "error"
+            assert "Argument list too long" in result["output"]
+
+    def test_cancel_event_stops_job(self):
+        cancel = threading.Event()
+        timer = threading.Timer(0.3, cancel.set)
+        timer.start()
+        started = time.monotonic()
+        result = run_subprocess(
+            [sys.executable, "-c", "import time; time.sleep(30)"], {}, cancel_event=cancel
+        )
+        timer.cancel()
+        assert time.monotonic() - started < 10
+        assert result["status"] == "error"
+        assert result["data"]["cancelled"] == "cancelled"
+
+    def test_client_disconnect_stops_job(self):
+        result = run_subprocess(
+            [sys.executable, "-c", "import time; time.sleep(30)"],
+            {},
+            is_disconnected=lambda: True,
+        )
+        assert result["status"] == "error"
+        assert result["data"]["cancelled"] == "disconnected"
+
+    @pytest.mark.skipif(os.name == "nt", reason="uses POSIX process groups")
+    def test_timeout_kills_grandchildren(self, tmp_path):
+        """The whole process tree is killed, not just the direct child."""
+        pid_file = tmp_path / "grandchild.pid"
+        script = (
+            "import subprocess, sys, time\n"
+            "p = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])\n"
+            f"open({str(pid_file)!r}, 'w').write(str(p.pid))\n"
+            "time.sleep(30)\n"
+        )
+        result = run_subprocess([sys.executable, "-c", script], {}, timeout=1)
+        assert result["data"]["cancelled"] == "timeout"
+
+        grandchild = int(pid_file.read_text())
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and _pid_alive(grandchild):
+            time.sleep(0.05)
+        assert not _pid_alive(grandchild)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # A killed but unreaped grandchild lingers as a zombie; count that as dead.
+    try:
+        with open(f"/proc/{pid}/stat") as fh:
+            return fh.read().split(")")[-1].split()[0] != "Z"
+    except OSError:
+        return True
+
 
 # ---------------------------------------------------------------------------
 # run_callable
@@ -93,3 +168,56 @@ class TestRunCallable:
         assert result["status"] == "error"
         assert "boom" in result["output"]
         assert result["data"] == {}
+
+
+class TestRunSubprocessCommandTemplate:
+    def test_list_values_become_separate_args(self):
+        with patch("utilities_web.processor._UsagePopen") as mock_popen:
+            _mock_popen(mock_popen)
+            run_subprocess(["cat", "{files}"], {"files": ["a.csv", "b.csv"]})
+            assert mock_popen.call_args.args[0] == ["cat", "a.csv", "b.csv"]
+
+    def test_argfile_removed_after_run(self, tmp_path):
+        template = CommandTemplate(
+            [sys.executable, "-c", "import sys; print(open(sys.argv[1][1:]).read())", "{files}"],
+            fields=["files"],
+        )
+        with patch("utilities_web.command.arg_max", return_value=50):
+            result = run_subprocess(
+                template, {"files": ["a.csv", "b.csv"]}, manifest_dir=str(tmp_path)
+            )
+        assert result["status"] == "success"
+        assert result["output"].split() == ["a.csv", "b.csv"]
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.skipif(
+        os.name == "nt" or shutil.which("true") is None, reason="needs POSIX argv limits"
+    )
+    def test_argfile_used_at_real_limit(self, tmp_path):
+        # 32-byte entries whose text alone fits under ARG_MAX, but whose argv
+        # pointers push the real argument block over the kernel's limit.
+        env_bytes = sum(len(k) + len(v) + 2 for k, v in os.environ.items())
+        count = (os.sysconf("SC_ARG_MAX") - env_bytes - 8192) // 32
+        files = [f"{i:031d}" for i in range(count)]
+        result = run_subprocess(["true", "{files}"], {"files": files}, manifest_dir=str(tmp_path))
+        assert result["status"] == "success"
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestRunSubprocessUsage:
+    @pytest.mark.skipif(not hasattr(os, "wait4"), reason="needs os.wait4")
+    def test_timed_out_job_reports_usage(self):
+        result = run_subprocess(
+            [sys.executable, "-c", "while True: pass"], {}, timeout=0.3
+        )
+        assert result["data"]["cancelled"] == "timeout"
+        usage = result["data"]["usage"]
+        assert usage["cpu_seconds"] > 0
+        assert usage["max_rss_kb"] > 0
+
+    @pytest.mark.skipif(not hasattr(os, "wait4"), reason="needs os.wait4")
+    def test_reports_child_resource_usage(self):
+        result = run_subprocess([sys.executable, "-c", "sum(range(100000))"], {})
+        usage = result["data"]["usage"]
+        assert usage["cpu_seconds"] >= 0
+        assert usage["max_rss_kb"] > 0
@@ -0,0 +1,195 @@
+"""Tests for utilities_web.suite — create_suite and shared hosting."""
+
+import sys
+import threading
+
+import pytest
+from flask import request
+
+from utilities_web import TextInput, Utility, create_suite
+
+
+def _echo(**kwargs):
+    return {"status": "success", "output": f"echo {kwargs}", "data": {}}
+
+
+def _make_suite(tmp_path, **kwargs):
+    app = create_suite(
+        {
+            "alpha": Utility(
+                title="Alpha Tool",
+                description="Does alpha things",
+                inputs=[TextInput("word")],
+                process_handler=_echo,
+            ),
+            "beta": Utility(title="Beta Tool", process_handler=_echo, max_concurrent=1),
+        },
+        title="Tool Suite",
+        upload_folder=str(tmp_path / "uploads"),
+        **kwargs,
+    )
+    app.config["TESTING"] = True
+    return app
+
+
+class TestCreateSuiteValidation:
+    def test_raises_without_utilities(self):
+        with pytest.raises(ValueError, match="At least one utility"):
+            create_suite({})
+
+    def test_raises_on_duplicate_prefix(self):
+        util = Utility(process_handler=_echo)
+        with pytest.raises(ValueError, match="Duplicate utility prefix"):
+            create_suite({"tool": util, "/tool/": util})
+
+    @pytest.mark.parametrize("prefix", ["history", "/metrics/", "static"])
+    def test_raises_on_reserved_prefix(self, tmp_path, prefix):
+        with pytest.raises(ValueError, match=f"Utility prefix {prefix!r} is reserved"):
+            create_suite(
+                {prefix: Utility(process_handler=_echo)},
+                upload_folder=str(tmp_path / "uploads"),
+                history_db=str(tmp_path / "h.db"),
+            )
+
+    def test_raises_on_empty_prefix(self):
+        with pytest.raises(ValueError, match="Invalid utility prefix"):
+            create_suite({"/": Utility(process_handler=_echo)})
+
+    def test_utility_requires_processor(self):
+        with pytest.raises(ValueError, match="Either process_command or process_handler"):
+            Utility(title="Nothing")
+
+
+class TestSuiteRoutes:
+    def test_index_lists_utilities(self, tmp_path):
+        app = _make_suite(tmp_path)
+        with app.test_client() as client:
+            html = client.get("/").data.decode()
+            assert "Tool Suite" in html
+            assert "Alpha Tool" in html
+            assert "Does alpha things" in html
+            assert 'href="/beta/"' in html
+
+    def test_utility_mounted_under_prefix(self, tmp_path):
+        app = _make_suite(tmp_path)
+        with app.test_client() as client:
+            html = client.get("/alpha/").data.decode()
+            assert "Alpha Tool" in html
+            assert 'href="/"' in html
+
+    def test_cancel_url_under_prefix(self, tmp_path):
+        app = create_suite(
+            {"run": Utility(title="Runner", process_command=["true"])},
+            upload_folder=str(tmp_path / "uploads"),
+        )
+        with app.test_client() as client:
+            assert "/run/cancel/" in client.get("/run/").data.decode()
+
+    def test_post_runs_on_shared_executor(self, tmp_path):
+        app = _make_suite(tmp_path)
+        with app.test_client() as client:
+            response = client.post("/alpha/", data={"word": "hi"})
+            assert response.status_code == 200
+            assert "echo {&#39;word&#39;: &#39;hi&#39;}" in response.data.decode()
+            assert 'href="/alpha/"' in response.data.decode()
+
+    def test_uploads_go_to_per_utility_subfolder(self, tmp_path):
+        _make_suite(tmp_path)
+        assert (tmp_path / "uploads" / "alpha").is_dir()
+        assert (tmp_path / "uploads" / "beta").is_dir()
+
+    def test_metrics_are_per_utility(self, tmp_path):
+        app = _make_suite(tmp_path)
+        with app.test_client() as client:
+            client.post("/alpha/", data={"word": "hi"})
+            metrics = client.get("/metrics").get_json()
+            assert metrics["alpha"]["succeeded"] == 1
+            assert metrics["beta"]["started"] == 0
+            assert metrics["beta"]["max_concurrent"] == 1
+            assert client.get("/beta/metrics").get_json()["succeeded"] == 0
+
+    def test_limit_is_per_utility(self, tmp_path):
+        app = _make_suite(tmp_path)
+        app.extensions["utilities_web.jobs"]["beta"].start("busy")
+        with app.test_client() as client:
+            response = client.post("/beta/", data={})
+            assert response.status_code == 302
+            assert client.post("/alpha/", data={"word": "x"}).status_code == 200
+
+
+class TestSuiteExecutor:
+    def test_handler_can_use_request(self, tmp_path):
+        app = create_suite(
+            {"who": Utility(process_handler=lambda: f"path {request.path}")},
+            upload_folder=str(tmp_path / "uploads"),
+        )
+        with app.test_client() as client:
+            html = client.post("/who/", data={}).data.decode()
+            assert "path /who/" in html
+
+    def test_job_cancelled_while_queued_never_starts(self, tmp_path):
+        release = threading.Event()
+        marker = tmp_path / "ran"
+        app = create_suite(
+            {
+                "slow": Utility(process_handler=lambda: release.wait(5) and "done"),
+                "queued": Utility(
+                    process_command=[sys.executable, "-c", f"open({str(marker)!r}, 'w')"],
+                ),
+            },
+            upload_folder=str(tmp_path / "uploads"),
+            max_workers=1,
+        )
+        registries = app.extensions["utilities_web.jobs"]
+        responses = {}
+
+        def submit(prefix):
+            with app.test_client() as client:
+                responses[prefix] = client.post(f"/{prefix}/", data={"_job_id": prefix})
+
+        threads = [threading.Thread(target=submit, args=(p,)) for p in ("slow", "queued")]
+        threads[0].start()
+        while "slow" not in registries["slow"]:
+            threading.Event().wait(0.01)
+        threads[1].start()
+        while "queued" not in registries["queued"]:
+            threading.Event().wait(0.01)
+        assert registries["queued"].metrics()["active"] == 1
+
+        with app.test_client() as client:
+            assert client.post("/queued/cancel/queued").status_code == 200
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert "Process cancelled" in responses["queued"].data.decode()
+        assert not marker.exists()
+        assert registries["queued"].metrics()["cancelled"] == 1
+
+
+class TestSuiteHistory:
+    def test_shared_history_records_each_utility(self, tmp_path):
+        app = _make_suite(tmp_path, history_db=str(tmp_path / "h.db"))
+        with app.test_client() as client:
+            client.post("/alpha/", data={"word": "x"})
+            client.post("/beta/", data={})
+            assert "Dashboard" in client.get("/").data.decode()
+            html = client.get("/history?utility=beta").data.decode()
+            assert "Beta Tool" in html
+        history = app.extensions["utilities_web.history"]
+        assert history.utilities() == ["alpha", "beta"]
+
+    def test_utilities_with_same_title_kept_apart(self, tmp_path):
+        app = create_suite(
+            {"one": Utility(process_handler=_echo), "two": Utility(process_handler=_echo)},
+            upload_folder=str(tmp_path / "uploads"),
+            history_db=str(tmp_path / "h.db"),
+        )
+        with app.test_client() as client:
+            client.post("/one/", data={})
+            client.post("/two/", data={})
+            client.post("/two/", data={})
+            summary = client.get("/history/dashboard?format=json").get_json()
+            assert summary["one"][0]["jobs"] == 1
+            assert summary["two"][0]["jobs"] == 2
+            assert 'href="/history?utility=two"' in client.get("/two/").data.decode()
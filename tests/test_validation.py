@@ -0,0 +1,136 @@
+"""Tests for utilities_web.validation — FormValidator."""
+
+import io
+
+from werkzeug.datastructures import FileStorage, ImmutableMultiDict, MultiDict
+
+from utilities_web import CheckboxInput, FileInput, NumberInput, SelectInput, TextInput
+from utilities_web.validation import FormValidator
+
+
+def _validate(inputs, form=None, files=None):
+    return FormValidator(inputs).validate(
+        ImmutableMultiDict(form or {}), MultiDict(files or {})
+    )
+
+
+def _file(name, data=b"data"):
+    return FileStorage(stream=io.BytesIO(data), filename=name)
+
+
+class TestNumber:
+    def test_integral_step_yields_int(self):
+        result = _validate([NumberInput("n", min_val=1, max_val=10, step=1)], {"n": "4"})
+        assert result.ok
+        assert result.values["n"] == 4
+        assert isinstance(result.values["n"], int)
+        assert result.raw["n"] == "4"
+
+    def test_no_step_yields_float(self):
+        result = _validate([NumberInput("x")], {"x": "2.5"})
+        assert result.values["x"] == 2.5
+
+    def test_bounds(self):
+        inputs = [NumberInput("n", label="N", min_val=0, max_val=10)]
+        assert _validate(inputs, {"n": "-1"}).errors == {"n": "N: must be at least 0"}
+        assert _validate(inputs, {"n": "11"}).errors == {"n": "N: must be at most 10"}
+
+    def test_step(self):
+        inputs = [NumberInput("n", min_val=1, step=2)]
+        assert _validate(inputs, {"n": "5"}).ok
+        assert "steps of 2" in _validate(inputs, {"n": "4"}).errors["n"]
+
+    def test_fractional_step(self):
+        assert _validate([NumberInput("n", step=0.1)], {"n": "0.3"}).ok
+
+    def test_not_a_number(self):
+        assert "not a number" in _validate([NumberInput("n")], {"n": "abc"}).errors["n"]
+        assert "not a number" in _validate([NumberInput("n")], {"n": "nan"}).errors["n"]
+
+    def test_empty_optional_is_none(self):
+        result = _validate([NumberInput("n")], {"n": ""})
+        assert result.values["n"] is None
+        assert result.raw["n"] == ""
+
+    def test_empty_required(self):
+        result = _validate([NumberInput("n", label="Count", required=True)])
+        assert result.errors == {"n": "Missing required field: Count"}
+
+
+class TestSelect:
+    def test_valid_choice(self):
+        result = _validate([SelectInput("c", choices=[("r", "Red"), "blue"])], {"c": "blue"})
+        assert result.values["c"] == "blue"
+
+    def test_invalid_choice(self):
+        result = _validate([SelectInput("c", choices=["a"])], {"c": "Red"})
+        assert "not one of the available choices" in result.errors["c"]
+
+    def test_empty_optional_is_none(self):
+        assert _validate([SelectInput("c", choices=["a"])]).values["c"] is None
+
+
+class TestTextAndCheckbox:
+    def test_text_and_checkbox_values(self):
+        result = _validate(
+            [TextInput("t"), CheckboxInput("on"), CheckboxInput("off")],
+            {"t": "hi", "on": "true"},
+        )
+        assert result.values == {"t": "hi", "on": True, "off": False}
+
+    def test_required_text(self):
+        result = _validate([TextInput("t", label="Name", required=True)])
+        assert result.errors == {"t": "Missing required field: Name"}
+
+
+class TestFile:
+    def test_required_file_missing(self):
+        result = _validate([FileInput("f", label="Config")])
+        assert result.errors == {"f": "Missing required file: Config"}
+
+    def test_files_are_not_in_values(self):
+        result = _validate([FileInput("f")], files={"f": _file("a.csv")})
+        assert result.ok
+        assert "f" not in result.values
+
+    def test_accept_extensions(self):
+        inputs = [FileInput("f", accept=".csv,.json")]
+        assert _validate(inputs, files={"f": _file("DATA.CSV")}).ok
+        assert "not accepted" in _validate(inputs, files={"f": _file("a.exe")}).errors["f"]
+
+    def test_accept_multi_part_extension(self):
+        inputs = [FileInput("f", accept=".tar.gz,.CSV")]
+        assert _validate(inputs, files={"f": _file("x.tar.gz")}).ok
+        assert _validate(inputs, files={"f": _file("Data.csv")}).ok
+        assert "not accepted" in _validate(inputs, files={"f": _file("x.gz")}).errors["f"]
+
+    def test_accept_mime_wildcard(self):
+        inputs = [FileInput("f", accept="image/*")]
+        assert _validate(inputs, files={"f": _file("a.png")}).ok
+        assert not _validate(inputs, files={"f": _file("a.csv")}).ok
+
+    def test_max_size(self):
+        inputs = [FileInput("f", max_size_mb=0.001)]
+        assert _validate(inputs, files={"f": _file("a.csv", b"x" * 100)}).ok
+        assert "size limit" in _validate(inputs, files={"f": _file("a.csv", b"x" * 2000)}).errors["f"]
+
+    def test_multiple_files_each_checked(self):
+        files = MultiDict([("f", _file("a.csv")), ("f", _file("b.txt"))])
+        result = FormValidator([FileInput("f", multiple=True, accept=".csv")]).validate(
+            ImmutableMultiDict(), files
+        )
+        assert "b.txt" in result.errors["f"]
+
+
+class TestAllErrors:
+    def test_every_invalid_field_reported(self):
+        result = _validate(
+            [
+                TextInput("t", required=True),
+                NumberInput("n", max_val=1),
+                SelectInput("s", choices=["a"]),
+                FileInput("f"),
+            ],
+            {"n": "5", "s": "z"},
+        )
+        assert set(result.errors) == {"t", "n", "s", "f"}